@@ -0,0 +1,261 @@
+"""
+GeoJSON Cache Module
+Stores the towers and lines of a large GeoJSON file as columnar NumPy
+arrays in a sidecar .npz next to the source, so repeated loads skip JSON
+parsing entirely. The sidecar is rebuilt whenever the source changes.
+
+The cache also carries a small spatial index so region queries touch only
+nearby features: towers sorted by longitude (binary-searched per query)
+and a bounding box per line (tested before any vertex is looked at).
+"""
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+CACHE_SUFFIX = '.cache.npz'
+CACHE_VERSION = 4
+
+# Ids and properties are stored as a str column plus a <name>_kind column
+# recording each value's JSON type, so they load back unchanged without
+# pickling: str as-is, int as its digits, null as '', anything else as JSON
+KIND_STR, KIND_INT, KIND_NULL, KIND_JSON = 0, 1, 2, 3
+VALUE_COLUMNS = ('tower_id', 'tower_power', 'tower_voltage',
+                 'line_id', 'line_power', 'line_voltage', 'line_cables')
+
+
+def cache_path_for(geojson_path: str) -> str:
+    """Return the sidecar cache path for a GeoJSON file."""
+    return geojson_path + CACHE_SUFFIX
+
+
+def _source_stamp(geojson_path: str) -> np.ndarray:
+    """Identify the source file version: (mtime, size, cache format version)."""
+    st = os.stat(geojson_path)
+    return np.array([st.st_mtime, st.st_size, CACHE_VERSION], dtype=np.float64)
+
+
+def load_columnar_cache(geojson_path: str) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Load the columnar cache of a GeoJSON file.
+
+    Returns:
+        Dict of column arrays, or None if the cache is missing or stale.
+        An unreadable cache (truncated, corrupt, or an old format) is
+        deleted so the next build replaces it.
+    """
+    path = cache_path_for(geojson_path)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with np.load(path) as npz:
+            if not np.array_equal(npz['stamp'], _source_stamp(geojson_path)):
+                return None
+            return {key: npz[key] for key in npz.files}
+    except Exception as e:
+        print(f"Discarding unreadable GeoJSON cache {path}: {e}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+
+def write_columnar_cache(geojson_path: str, features: Iterable[dict]) -> Dict[str, np.ndarray]:
+    """
+    Split GeoJSON features into tower (Point) and line (LineString) columns
+    and write them to the sidecar cache.
+
+    Line coordinates are stored flattened as an (M, 2) lon/lat array, with
+    line i spanning rows line_offsets[i]:line_offsets[i + 1]. Ids and
+    properties keep their GeoJSON values and types (see VALUE_COLUMNS and
+    column_values), so cached loads return the same records as parsing
+    the file.
+
+    Returns:
+        The dict of column arrays that was written.
+    """
+    tower_id, tower_lon, tower_lat, tower_power, tower_voltage = [], [], [], [], []
+    line_id, line_power, line_voltage, line_cables = [], [], [], []
+    line_offsets = [0]
+    line_coords = []
+
+    for i, feature in enumerate(features):
+        geom = feature.get('geometry') or {}
+        geom_type = geom.get('type', '')
+        coords = geom.get('coordinates') or []
+        props = feature.get('properties') or {}
+
+        if geom_type == 'Point' and len(coords) >= 2:
+            tower_id.append(feature.get('id', i))
+            tower_lon.append(coords[0])
+            tower_lat.append(coords[1])
+            tower_power.append(props.get('power', 'tower'))
+            tower_voltage.append(props.get('voltage', ''))
+
+        elif geom_type == 'LineString' and coords:
+            line_id.append(feature.get('id', i))
+            line_power.append(props.get('power', 'line'))
+            line_voltage.append(props.get('voltage', ''))
+            line_cables.append(props.get('cables', ''))
+            line_coords.extend((c[0], c[1]) for c in coords if len(c) >= 2)
+            line_offsets.append(len(line_coords))
+
+    columns = {
+        'stamp': _source_stamp(geojson_path),
+        'tower_lon': np.array(tower_lon, dtype=np.float64),
+        'tower_lat': np.array(tower_lat, dtype=np.float64),
+        'line_offsets': np.array(line_offsets, dtype=np.int64),
+        'line_coords': np.array(line_coords, dtype=np.float64).reshape(-1, 2),
+    }
+    for name, values in zip(VALUE_COLUMNS, (tower_id, tower_power, tower_voltage,
+                                            line_id, line_power, line_voltage, line_cables)):
+        columns[name], columns[name + '_kind'] = _encode_values(values)
+    columns.update(_build_spatial_index(columns))
+
+    # Write to a temp file first and sync it before the rename, so a crash
+    # never leaves a truncated cache in place
+    path = cache_path_for(geojson_path)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **columns)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    return columns
+
+
+def _encode_values(values: list) -> Tuple[np.ndarray, np.ndarray]:
+    """Split JSON values into a str column and a kind column (KIND_*)."""
+    text = []
+    kinds = np.zeros(len(values), dtype=np.uint8)
+    for i, v in enumerate(values):
+        if isinstance(v, str):
+            text.append(v)
+        elif v is None:
+            text.append('')
+            kinds[i] = KIND_NULL
+        elif type(v) is int:
+            text.append(str(v))
+            kinds[i] = KIND_INT
+        else:
+            text.append(json.dumps(v))
+            kinds[i] = KIND_JSON
+    return np.array(text, dtype=str), kinds
+
+
+def column_values(cache: Dict[str, np.ndarray], name: str, rows: np.ndarray) -> List:
+    """Values of a cached id/property column at rows, with their original types."""
+    values = cache[name][rows].tolist()
+    kinds = cache[name + '_kind'][rows]
+    for i in np.flatnonzero(kinds).tolist():
+        kind = kinds[i]
+        if kind == KIND_INT:
+            values[i] = int(values[i])
+        elif kind == KIND_NULL:
+            values[i] = None
+        else:
+            values[i] = json.loads(values[i])
+    return values
+
+
+def _build_spatial_index(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Build the tower longitude ordering and per-line bounding boxes."""
+    order = np.argsort(columns['tower_lon'], kind='stable')
+    
+    coords = columns['line_coords']
+    starts = columns['line_offsets'][:-1]
+    if len(starts):
+        mins = np.minimum.reduceat(coords, starts, axis=0)
+        maxs = np.maximum.reduceat(coords, starts, axis=0)
+        bounds = np.hstack([mins, maxs])  # (lon_min, lat_min, lon_max, lat_max)
+    else:
+        bounds = np.empty((0, 4), dtype=np.float64)
+    
+    return {
+        'tower_lon_order': order,
+        'tower_lon_sorted': columns['tower_lon'][order],
+        'line_bounds': bounds,
+    }
+
+
+def query_towers(cache: Dict[str, np.ndarray],
+                 bbox: Tuple[float, float, float, float]) -> np.ndarray:
+    """
+    Indices of cached towers inside bbox (lat_min, lon_min, lat_max, lon_max),
+    in file order.
+    """
+    lat_min, lon_min, lat_max, lon_max = bbox
+    lon_sorted = cache['tower_lon_sorted']
+    lo = np.searchsorted(lon_sorted, lon_min, side='left')
+    hi = np.searchsorted(lon_sorted, lon_max, side='right')
+    
+    candidates = cache['tower_lon_order'][lo:hi]
+    lats = cache['tower_lat'][candidates]
+    hits = candidates[(lat_min <= lats) & (lats <= lat_max)]
+    hits.sort()
+    return hits
+
+
+def query_lines(cache: Dict[str, np.ndarray],
+                bbox: Tuple[float, float, float, float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Candidate lines for bbox (lat_min, lon_min, lat_max, lon_max), in file order.
+    
+    Returns:
+        (indices, contained): lines whose bounding box intersects bbox, and a
+        mask of those lying entirely inside it (which need no vertex check).
+    """
+    lat_min, lon_min, lat_max, lon_max = bbox
+    b = cache['line_bounds']
+    intersects = ((b[:, 0] <= lon_max) & (b[:, 2] >= lon_min) &
+                  (b[:, 1] <= lat_max) & (b[:, 3] >= lat_min))
+    indices = np.flatnonzero(intersects)
+    
+    bi = b[indices]
+    contained = ((bi[:, 0] >= lon_min) & (bi[:, 2] <= lon_max) &
+                 (bi[:, 1] >= lat_min) & (bi[:, 3] <= lat_max))
+    return indices, contained
+
+
+def line_vertex_rows(cache: Dict[str, np.ndarray],
+                     indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rows of line_coords holding the vertices of the given lines.
+    
+    Returns:
+        (rows, counts): the vertex rows of all lines concatenated in order,
+        and the number of vertices of each line
+    """
+    offsets = cache['line_offsets']
+    starts = offsets[indices]
+    counts = offsets[indices + 1] - starts
+    seg_starts = np.cumsum(counts) - counts
+    rows = np.arange(counts.sum()) + np.repeat(starts - seg_starts, counts)
+    return rows, counts
+
+
+def any_vertex_in_bbox(cache: Dict[str, np.ndarray], indices: np.ndarray,
+                       bbox: Tuple[float, float, float, float]) -> np.ndarray:
+    """
+    For each cached line in indices, whether any of its vertices lies inside
+    bbox (lat_min, lon_min, lat_max, lon_max).
+    
+    The vertices of all requested lines are gathered and tested in one
+    vectorized pass, then reduced per line, instead of one array per line.
+    """
+    if not len(indices):
+        return np.zeros(0, dtype=bool)
+    
+    lat_min, lon_min, lat_max, lon_max = bbox
+    rows, counts = line_vertex_rows(cache, indices)
+    seg_starts = np.cumsum(counts) - counts  # every cached line has >= 1 vertex
+    
+    pts = cache['line_coords'][rows]
+    inside = ((lon_min <= pts[:, 0]) & (pts[:, 0] <= lon_max) &
+              (lat_min <= pts[:, 1]) & (pts[:, 1] <= lat_max))
+    return np.logical_or.reduceat(inside, seg_starts)
+
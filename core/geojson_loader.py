@@ -3,15 +3,44 @@ GeoJSON Loader Module
 Efficiently loads and processes the large IndiaTransmission GeoJSON file.
 Uses streaming parsing for memory efficiency.
 """
-import json
+import mmap
 import os
-from typing import Dict, List, Tuple, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, NamedTuple, Tuple, Optional
 from functools import lru_cache
+from itertools import compress
+
+import numpy as np
+
+from core.geojson_cache import (load_columnar_cache, write_columnar_cache,
+                                query_towers, query_lines, any_vertex_in_bbox,
+                                line_vertex_rows, column_values)
+
+try:
+    import orjson as _json
+    _LOADS_BUFFERS = True  # orjson.loads decodes a memoryview in place
+except ImportError:  # stdlib json.loads also accepts bytes
+    import json as _json
+    _LOADS_BUFFERS = False
+
+try:
+    import ijson
+except ImportError:  # Fall back to json.loads on the whole file
+    ijson = None
 
 # Path to the GeoJSON file
 GEOJSON_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
                             'IndiaTransmission - Copy.geojson')
 
+# First synthetic node ID given to line vertices by convert_to_osm_format
+LINE_NODE_ID_START = 9000000000
+
+# In-process memo of recent loads, keyed on the arguments plus the source
+# file's mtime so a regenerated GeoJSON is picked up automatically
+_FEATURES_MEMO_SIZE = 8
+_features_memo: "OrderedDict[tuple, tuple]" = OrderedDict()
+
 # Regional bounding boxes for India (lat_min, lon_min, lat_max, lon_max)
 REGIONS = {
     'All India': (6.0, 68.0, 37.0, 98.0),
@@ -24,16 +53,104 @@ REGIONS = {
 }
 
 
+class Tower(NamedTuple):
+    """A tower/pole point feature."""
+    id: Any
+    lon: float
+    lat: float
+    power: str
+    voltage: str
+
+
+class Line(NamedTuple):
+    """A LineString feature; coordinates is a list of [lon, lat] pairs."""
+    id: Any
+    coordinates: list
+    power: str
+    voltage: str
+    cables: str
+
+
 def is_in_bbox(lon: float, lat: float, bbox: Tuple[float, float, float, float]) -> bool:
     """Check if a point is within a bounding box."""
     lat_min, lon_min, lat_max, lon_max = bbox
     return lat_min <= lat <= lat_max and lon_min <= lon <= lon_max
 
 
+def points_in_bbox(lons: np.ndarray, lats: np.ndarray,
+                   bbox: Tuple[float, float, float, float]) -> np.ndarray:
+    """Vectorized is_in_bbox: boolean mask of the points inside a bounding box."""
+    lat_min, lon_min, lat_max, lon_max = bbox
+    return (lat_min <= lats) & (lats <= lat_max) & (lon_min <= lons) & (lons <= lon_max)
+
+
+def line_in_bbox(coords: list, bbox: Tuple[float, float, float, float]) -> bool:
+    """
+    Check if any vertex of a LineString is within a bounding box.
+    
+    Uniform positions are tested in one vectorized pass; lines mixing 2D and
+    3D positions (which NumPy cannot stack) are checked vertex by vertex.
+    """
+    try:
+        arr = np.asarray(coords, dtype=np.float64)
+    except (ValueError, TypeError):
+        arr = None
+    if arr is not None and arr.ndim == 2 and arr.shape[1] >= 2:
+        return bool(points_in_bbox(arr[:, 0], arr[:, 1], bbox).any())
+    return any(is_in_bbox(c[0], c[1], bbox) for c in coords if len(c) >= 2)
+
+
+@contextmanager
+def _open_mapped(path: str):
+    """
+    Open a file as a read-only memory map (a plain binary file if it is empty).
+    
+    The mapping supports read()/tell() like a file, so parsers consume it
+    directly; pages are faulted in only as far as the parser actually reads,
+    and the kernel is told to expect a sequential scan.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield f
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            yield mm
+
+
+def _iter_features(f):
+    """
+    Iterate over the features of an open (binary) GeoJSON file.
+    
+    With ijson the features are parsed incrementally while the file is read;
+    without it the whole document is decoded first and the feature list
+    itself is returned, so callers can size progress by len().
+    """
+    if ijson is not None:
+        return ijson.items(f, 'features.item', use_float=True)
+    data = _loads_document(f)
+    return data.get('features', [])
+
+
+def _loads_document(f):
+    """
+    Decode the whole JSON document in an open (binary) file or memory map.
+    
+    orjson parses a memory map through a memoryview without first copying
+    the file into a bytes object; otherwise the content is read out.
+    """
+    if _LOADS_BUFFERS and isinstance(f, mmap.mmap):
+        with memoryview(f) as view:
+            return _json.loads(view)
+    return _json.loads(f.read())
+
+
 def load_geojson_features(region: str = 'All India', 
                           max_towers: int = 10000,
                           max_lines: int = 2000,
-                          progress_callback=None) -> Tuple[List[Dict], List[Dict]]:
+                          progress_callback=None,
+                          use_cache: bool = True) -> Tuple[List[Tower], List[Line]]:
     """
     Load GeoJSON features with optional region filtering.
     
@@ -42,14 +159,41 @@ def load_geojson_features(region: str = 'All India',
         max_towers: Maximum number of tower points to load
         max_lines: Maximum number of line features to load
         progress_callback: Optional callback function for progress updates
+        use_cache: Read from (and build if needed) the columnar .npz sidecar
+            instead of parsing the GeoJSON on every call
         
     Returns:
-        Tuple of (towers_list, lines_list)
+        Tuple of (towers_list, lines_list) of Tower / Line records
     """
     if not os.path.exists(GEOJSON_PATH):
         print(f"GeoJSON file not found: {GEOJSON_PATH}")
         return [], []
     
+    # Repeated calls with the same arguments reuse the previous result; the
+    # records are shared, so callers must treat them as read-only
+    key = (GEOJSON_PATH, os.path.getmtime(GEOJSON_PATH),
+           region, max_towers, max_lines, use_cache)
+    if key in _features_memo:
+        _features_memo.move_to_end(key)
+        towers, lines = _features_memo[key]
+        if progress_callback:
+            progress_callback(100, f"Loaded {len(towers)} towers, {len(lines)} lines (cached)")
+        return list(towers), list(lines)
+    
+    towers, lines = _load_geojson_features_uncached(
+        region, max_towers, max_lines, progress_callback, use_cache)
+    
+    if towers or lines:
+        _features_memo[key] = (towers, lines)
+        if len(_features_memo) > _FEATURES_MEMO_SIZE:
+            _features_memo.popitem(last=False)
+    
+    return list(towers), list(lines)
+
+
+def _load_geojson_features_uncached(region: str, max_towers: int, max_lines: int,
+                                    progress_callback, use_cache: bool) -> Tuple[List[Tower], List[Line]]:
+    """Load and filter features from the cache or the GeoJSON file (no memo)."""
     bbox = REGIONS.get(region, REGIONS['All India'])
     towers = []
     lines = []
@@ -59,58 +203,75 @@ def load_geojson_features(region: str = 'All India',
     if progress_callback:
         progress_callback(0, "Opening GeoJSON file...")
     
+    if use_cache:
+        cache = _get_columnar_cache(progress_callback)
+        if cache is not None:
+            towers, lines = _filter_cached_features(cache, bbox, max_towers, max_lines)
+            if progress_callback:
+                progress_callback(100, f"Loaded {len(towers)} towers, {len(lines)} lines")
+            return towers, lines
+    
     try:
-        with open(GEOJSON_PATH, 'r', encoding='utf-8') as f:
-            # Read file in chunks for progress tracking
-            content = f.read()
+        with _open_mapped(GEOJSON_PATH) as f:
+            # Features are pulled one at a time, so hitting both caps stops
+            # reading the file instead of parsing it to the end.
+            if progress_callback:
+                progress_callback(5, "Streaming features..." if ijson is not None
+                                  else "Parsing JSON (install ijson to stream)...")
             
-        if progress_callback:
-            progress_callback(30, "Parsing JSON...")
-            
-        data = json.loads(content)
-        features = data.get('features', [])
-        total_features = len(features)
-        
-        if progress_callback:
-            progress_callback(50, f"Processing {total_features} features...")
-        
-        for i, feature in enumerate(features):
-            if len(towers) >= max_towers and len(lines) >= max_lines:
-                break
-                
-            geom = feature.get('geometry', {})
-            geom_type = geom.get('type', '')
-            coords = geom.get('coordinates', [])
-            props = feature.get('properties', {})
-            feature_id = feature.get('id', i)
+            features = _iter_features(f)
+            # Without ijson the file is already fully parsed, so progress is
+            # measured in features rather than bytes read
+            total = len(features) if isinstance(features, list) else None
             
-            if geom_type == 'Point' and len(towers) < max_towers:
-                lon, lat = coords[0], coords[1]
-                if is_in_bbox(lon, lat, bbox):
-                    towers.append({
-                        'id': feature_id,
-                        'lon': lon,
-                        'lat': lat,
-                        'power': props.get('power', 'tower'),
-                        'voltage': props.get('voltage', ''),
-                    })
-                    
-            elif geom_type == 'LineString' and len(lines) < max_lines:
-                # Check if any point of line is in bbox
-                in_region = any(is_in_bbox(c[0], c[1], bbox) for c in coords)
-                if in_region:
-                    lines.append({
-                        'id': feature_id,
-                        'coordinates': coords,
-                        'power': props.get('power', 'line'),
-                        'voltage': props.get('voltage', ''),
-                        'cables': props.get('cables', ''),
-                    })
+            # Hoist attribute lookups out of the per-feature loop
+            add_tower = towers.append
+            add_line = lines.append
+            in_bbox = is_in_bbox
+            n_towers = n_lines = 0
             
-            # Update progress every 10000 features
-            if progress_callback and i % 10000 == 0:
-                pct = 50 + int((i / total_features) * 45)
-                progress_callback(pct, f"Processed {i}/{total_features} features...")
+            for i, feature in enumerate(features):
+                if n_towers >= max_towers and n_lines >= max_lines:
+                    break
+                
+                # Update progress every 10000 features
+                if progress_callback and i % 10000 == 0:
+                    if total is None:
+                        done = f.tell() / max(file_size, 1)
+                        progress_callback(5 + int(done * 90), f"Processed {i} features...")
+                    else:
+                        done = i / max(total, 1)
+                        progress_callback(5 + int(done * 90), f"Processed {i}/{total} features...")
+                
+                try:
+                    geom = feature['geometry']
+                    geom_type = geom['type']
+                    coords = geom['coordinates']
+                except (KeyError, TypeError):
+                    continue  # no usable geometry
+                
+                if geom_type == 'Point':
+                    if n_towers >= max_towers:
+                        continue
+                    lon, lat = coords[0], coords[1]
+                    if in_bbox(lon, lat, bbox):
+                        props = feature.get('properties') or {}
+                        add_tower(Tower(feature.get('id', i), lon, lat,
+                                        props.get('power', 'tower'),
+                                        props.get('voltage', '')))
+                        n_towers += 1
+                        
+                elif geom_type == 'LineString':
+                    if n_lines >= max_lines:
+                        continue
+                    # Check if any point of line is in bbox
+                    if line_in_bbox(coords, bbox):
+                        props = feature.get('properties') or {}
+                        add_line(Line(feature.get('id', i), coords,
+                                      props.get('power', 'line'),
+                                      props.get('voltage', ''),
+                                      props.get('cables', '')))
+                        n_lines += 1
         
         if progress_callback:
             progress_callback(100, f"Loaded {len(towers)} towers, {len(lines)} lines")
@@ -122,7 +283,129 @@ def load_geojson_features(region: str = 'All India',
     return towers, lines
 
 
-def convert_to_osm_format(towers: List[Dict], lines: List[Dict]) -> Tuple[Dict, List, List]:
+def _get_columnar_cache(progress_callback=None) -> Optional[Dict[str, np.ndarray]]:
+    """Load the columnar cache for GEOJSON_PATH, building it on first use."""
+    cache = load_columnar_cache(GEOJSON_PATH)
+    if cache is not None:
+        return cache
+    
+    if progress_callback:
+        progress_callback(5, "Building columnar cache (one-time)...")
+    
+    try:
+        with _open_mapped(GEOJSON_PATH) as f:
+            return write_columnar_cache(GEOJSON_PATH, _iter_features(f))
+    except Exception as e:
+        print(f"Could not build GeoJSON cache: {e}")
+        return None
+
+
+def _select_cached(cache: Dict[str, np.ndarray],
+                   bbox: Tuple[float, float, float, float],
+                   max_towers: int,
+                   max_lines: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Apply the region filter and caps to cached columns, returning row indices."""
+    # Towers: binary search on the longitude index, then a latitude mask
+    t_idx = query_towers(cache, bbox)[:max_towers]
+    
+    # Lines: bounding-box candidates first, vertices only for partial overlaps
+    candidates, contained = query_lines(cache, bbox)
+    keep = contained.copy()
+    keep[~contained] = any_vertex_in_bbox(cache, candidates[~contained], bbox)
+    
+    return t_idx, candidates[keep][:max_lines]
+
+
+def _cached_tower_rows(cache: Dict[str, np.ndarray], t_idx: np.ndarray):
+    """Iterate (id, lon, lat, power, voltage) of the selected cached towers."""
+    return zip(column_values(cache, 'tower_id', t_idx), cache['tower_lon'][t_idx].tolist(),
+               cache['tower_lat'][t_idx].tolist(), column_values(cache, 'tower_power', t_idx),
+               column_values(cache, 'tower_voltage', t_idx))
+
+
+def _filter_cached_features(cache: Dict[str, np.ndarray],
+                            bbox: Tuple[float, float, float, float],
+                            max_towers: int,
+                            max_lines: int) -> Tuple[List[Tower], List[Line]]:
+    """Apply the region filter and caps to cached columns, returning records."""
+    t_idx, l_idx = _select_cached(cache, bbox, max_towers, max_lines)
+    towers = list(map(Tower._make, _cached_tower_rows(cache, t_idx)))
+    
+    coords = cache['line_coords']
+    offsets = cache['line_offsets']
+    lines = [Line(line_id, coords[offsets[i]:offsets[i + 1]].tolist(), power, voltage, cables)
+             for i, line_id, power, voltage, cables in zip(
+                 l_idx.tolist(), column_values(cache, 'line_id', l_idx),
+                 column_values(cache, 'line_power', l_idx),
+                 column_values(cache, 'line_voltage', l_idx),
+                 column_values(cache, 'line_cables', l_idx))]
+    
+    return towers, lines
+
+
+def build_line_node_arrays(lines: List[Line]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict]]:
+    """
+    Allocate synthetic OSM node IDs for every line vertex in one pass.
+    
+    Returns:
+        Tuple of (node_ids, lons, lats, osm_lines): flat arrays with one entry
+        per vertex, and OSM-style line dicts referencing those node IDs
+    """
+    line_coords = [lonlat_positions(line.coordinates)[0] for line in lines]
+    counts = [len(arr) for arr in line_coords]
+    total = sum(counts)
+    
+    # Start with high ID to avoid conflicts with real OSM node IDs
+    node_ids = np.arange(LINE_NODE_ID_START, LINE_NODE_ID_START + total, dtype=np.int64)
+    if total:
+        coords = np.concatenate(line_coords)
+    else:
+        coords = np.empty((0, 2), dtype=np.float64)
+    
+    osm_lines = _split_line_nodes(node_ids, counts, [line.voltage for line in lines])
+    return node_ids, coords[:, 0], coords[:, 1], osm_lines
+
+
+def lonlat_positions(positions: list) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Convert GeoJSON positions to an (N, 2) lon/lat array, dropping any altitude.
+    
+    Positions are usually all [lon, lat] (or all [lon, lat, alt]), which
+    NumPy converts in one call. Mixed or malformed lists fall back to
+    taking lon/lat per position and dropping positions shorter than 2.
+    
+    Returns:
+        (lonlat, usable): usable is None when every position was kept,
+        else the mask of the positions that were
+    """
+    try:
+        arr = np.array(positions, dtype=np.float64)
+    except (ValueError, TypeError):  # ragged
+        arr = None
+    if arr is not None and arr.ndim == 2 and arr.shape[1] >= 2:
+        return np.ascontiguousarray(arr[:, :2]), None
+    
+    usable = np.fromiter((len(p) >= 2 for p in positions), dtype=np.bool_, count=len(positions))
+    lonlat = np.array([(p[0], p[1]) for p in compress(positions, usable.tolist())],
+                      dtype=np.float64).reshape(-1, 2)
+    return lonlat, usable
+
+
+def _split_line_nodes(node_ids: np.ndarray, counts, voltages) -> List[Dict]:
+    """Cut the flat vertex node IDs into one OSM-style line dict per line."""
+    id_list = node_ids.tolist()
+    osm_lines = [None] * len(counts)
+    start = 0
+    for i, (n, voltage) in enumerate(zip(counts, voltages)):
+        osm_lines[i] = {
+            'nodes': id_list[start:start + n],
+            'voltage': voltage,
+        }
+        start += n
+    return osm_lines
+
+
+def convert_to_osm_format(towers: List[Tower], lines: List[Line]) -> Tuple[Dict, List, List]:
     """
     Convert GeoJSON features to OSM-like format for compatibility with existing code.
     
@@ -130,48 +413,125 @@ def convert_to_osm_format(towers: List[Dict], lines: List[Dict]) -> Tuple[Dict,
         Tuple of (nodes_dict, poles_list, lines_list) matching process_osm_data output format
     """
     nodes = {}
-    poles = []
-    osm_lines = []
     
     # Process towers as nodes/poles
-    for tower in towers:
-        node_id = tower['id']
+    poles = [tower.id for tower in towers]
+    _add_tower_nodes(nodes, towers)
+    
+    # Process lines - for GeoJSON LineStrings, we create synthetic node IDs
+    node_ids, lons, lats, osm_lines = build_line_node_arrays(lines)
+    _add_vertex_nodes(nodes, node_ids, lons, lats)
+    
+    return nodes, poles, osm_lines
+
+
+def _add_tower_nodes(nodes: Dict, rows) -> None:
+    """Add (id, lon, lat, power, voltage) tower rows as tagged nodes."""
+    for node_id, lon, lat, power, voltage in rows:
         nodes[node_id] = {
-            'lat': tower['lat'],
-            'lon': tower['lon'],
+            'lat': lat,
+            'lon': lon,
             'tags': {
-                'power': tower['power'],
-                'voltage': tower.get('voltage', ''),
+                'power': power,
+                'voltage': voltage,
             }
         }
-        poles.append(node_id)
+
+
+def _add_vertex_nodes(nodes: Dict, node_ids: np.ndarray,
+                      lons: np.ndarray, lats: np.ndarray) -> None:
+    """Add synthetic line-vertex nodes to nodes; they carry no 'tags' key."""
+    nodes.update(zip(node_ids.tolist(),
+                     ({'lat': lat, 'lon': lon}
+                      for lon, lat in zip(lons.tolist(), lats.tolist()))))
+
+
+def load_geojson_as_osm(region: str = 'All India',
+                        max_towers: int = 10000,
+                        max_lines: int = 2000,
+                        progress_callback=None,
+                        use_cache: bool = True) -> Tuple[Dict, List, List]:
+    """
+    Load GeoJSON features straight into OSM-like format.
     
-    # Process lines - for GeoJSON LineStrings, we create synthetic node IDs
-    line_node_counter = 9000000000  # Start with high ID to avoid conflicts
+    Equivalent to convert_to_osm_format(*load_geojson_features(...)), but when
+    the columnar cache is available the nodes and lines are built directly
+    from its arrays, without materializing Tower/Line records in between.
     
-    for line in lines:
-        line_nodes = []
-        coords = line['coordinates']
-        voltage = line.get('voltage', '11000')
-        
-        for lon, lat in coords:
-            # Create a node for each coordinate
-            node_id = line_node_counter
-            line_node_counter += 1
+    Returns:
+        Tuple of (nodes_dict, poles_list, lines_list) matching process_osm_data output format
+    """
+    if use_cache and os.path.exists(GEOJSON_PATH):
+        cache = _get_columnar_cache(progress_callback)
+        if cache is not None:
+            bbox = REGIONS.get(region, REGIONS['All India'])
+            t_idx, l_idx = _select_cached(cache, bbox, max_towers, max_lines)
             
-            nodes[node_id] = {
-                'lat': lat,
-                'lon': lon,
-                'tags': {}
-            }
-            line_nodes.append(node_id)
-        
-        osm_lines.append({
-            'nodes': line_nodes,
-            'voltage': voltage
-        })
+            nodes = {}
+            poles = column_values(cache, 'tower_id', t_idx)
+            _add_tower_nodes(nodes, _cached_tower_rows(cache, t_idx))
+            
+            rows, counts = line_vertex_rows(cache, l_idx)
+            coords = cache['line_coords'][rows]
+            node_ids = np.arange(LINE_NODE_ID_START, LINE_NODE_ID_START + len(rows),
+                                 dtype=np.int64)
+            _add_vertex_nodes(nodes, node_ids, coords[:, 0], coords[:, 1])
+            osm_lines = _split_line_nodes(node_ids, counts.tolist(),
+                                          column_values(cache, 'line_voltage', l_idx))
+            
+            if progress_callback:
+                progress_callback(100, f"Loaded {len(poles)} towers, {len(osm_lines)} lines")
+            return nodes, poles, osm_lines
     
-    return nodes, poles, osm_lines
+    towers, lines = load_geojson_features(region, max_towers, max_lines,
+                                          progress_callback, use_cache)
+    return convert_to_osm_format(towers, lines)
+
+
+# Overpass format: properties.power = 'line', 'tower', etc.
+_POWER_MAP = {
+    'line': 'lines',
+    'minor_line': 'minor_lines',
+    'cable': 'cables',
+    'substation': 'substations',
+    'tower': 'towers',
+    'pole': 'poles',
+    'transformer': 'transformers',
+}
+
+# IndiaTransmission format: properties.type = 'Line', 'Tower', etc.
+_TYPE_MAP = {
+    'Line': 'lines',
+    'Cable': 'cables',
+    'Tower': 'towers',
+    'Substation_Icon': 'substations',
+    'Substation_Area': 'substations',
+    'Switch': 'others',
+    'Compensator': 'others',
+    'Transformer': 'transformers',
+    'Converter': 'others',
+}
+
+
+def _classify_features(features: list, result: Dict[str, list], progress_callback=None):
+    """Append each feature to its power-type bucket in result."""
+    total = len(features)
+    power_get = _POWER_MAP.get
+    type_get = _TYPE_MAP.get
+    
+    for i, feat in enumerate(features):
+        props = feat.get('properties', {})
+        key = power_get(props.get('power', ''))
+        
+        # Fallback to type field (IndiaTransmission format)
+        if key is None:
+            key = type_get(props.get('type', ''), 'others')
+        
+        result[key].append(feat)
+        
+        if progress_callback and i % 20000 == 0:
+            pct = 30 + int((i / total) * 65)
+            progress_callback(pct, f"Classified {i}/{total}...")
 
 
 def load_overpass_geojson(filepath: str, progress_callback=None) -> Dict[str, list]:
@@ -200,8 +560,8 @@ def load_overpass_geojson(filepath: str, progress_callback=None) -> Dict[str, li
     if progress_callback:
         progress_callback(0, "Opening GeoJSON file...")
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with _open_mapped(filepath) as f:
+        data = _loads_document(f)
     
     features = data.get('features', [])
     total = len(features)
@@ -209,45 +569,7 @@ def load_overpass_geojson(filepath: str, progress_callback=None) -> Dict[str, li
     if progress_callback:
         progress_callback(30, f"Classifying {total} features...")
     
-    # Overpass format: properties.power = 'line', 'tower', etc.
-    power_map = {
-        'line': 'lines',
-        'minor_line': 'minor_lines',
-        'cable': 'cables',
-        'substation': 'substations',
-        'tower': 'towers',
-        'pole': 'poles',
-        'transformer': 'transformers',
-    }
-    
-    # IndiaTransmission format: properties.type = 'Line', 'Tower', etc.
-    type_map = {
-        'Line': 'lines',
-        'Cable': 'cables',
-        'Tower': 'towers',
-        'Substation_Icon': 'substations',
-        'Substation_Area': 'substations',
-        'Switch': 'others',
-        'Compensator': 'others',
-        'Transformer': 'transformers',
-        'Converter': 'others',
-    }
-    
-    for i, feat in enumerate(features):
-        props = feat.get('properties', {})
-        power_type = props.get('power', '')
-        key = power_map.get(power_type, None)
-        
-        # Fallback to type field (IndiaTransmission format)
-        if key is None:
-            feat_type = props.get('type', '')
-            key = type_map.get(feat_type, 'others')
-        
-        result[key].append(feat)
-        
-        if progress_callback and i % 20000 == 0:
-            pct = 30 + int((i / total) * 65)
-            progress_callback(pct, f"Classified {i}/{total}...")
+    _classify_features(features, result, progress_callback)
     
     if progress_callback:
         progress_callback(100, "Classification complete!")
@@ -10,62 +10,205 @@ seconds instead of 13+ minutes.
 
 The resulting GridNetwork object has:
   - G: NetworkX graph with bus IDs as nodes, edges as line segments
-  - bus_geo: Dict[bus_id → (lon, lat)]
+       (built on first access; the build itself never needs it)
+  - bus_xy: (N, 2) NumPy array of bus (lon, lat), row = bus_id
   - bus_voltage: Dict[bus_id → kV]
-  - line_data: Dict[(from_bus, to_bus) → {voltage_kv, name, in_service, length_km}]
+  - node_ids: NumPy array of the bus IDs in the grid, ascending
+  - bus_geo: Dict[bus_id → (lon, lat)] (a snapshot built from bus_xy)
+  - line_from / line_to / line_voltage / line_length / line_active:
+      parallel NumPy arrays, one entry per line segment (line index = position)
+  - line_name / line_power_type: parallel lists of per-line labels
+  - edge_to_line: Dict[(min_bus, max_bus) → line index]
   - ext_grid_bus: The bus where the power source is connected
 """
 
+import re
 import networkx as nx
-import math
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import breadth_first_order, connected_components
+from scipy.spatial import cKDTree
 from typing import Dict, List, Tuple, Optional
+from contextlib import contextmanager
 from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import chain, compress, islice
+
+from core.geojson_loader import lonlat_positions
+
+
+def _empty(dtype) -> np.ndarray:
+    return np.empty(0, dtype=dtype)
 
 
 @dataclass
 class GridNetwork:
     """Lightweight grid representation (replaces pandapower net)."""
-    G: nx.Graph = field(default_factory=nx.Graph)
-    bus_geo: Dict[int, Tuple[float, float]] = field(default_factory=dict)     # bus_id -> (lon, lat)
+    # Bus coordinates, one (lon, lat) row per bus ID ever assigned; rows of
+    # buses dropped from the grid are left in place, node_ids lists the rest
+    bus_xy: np.ndarray = field(default_factory=lambda: np.empty((0, 2), dtype=np.float64))
     bus_voltage: Dict[int, float] = field(default_factory=dict)                # bus_id -> kV
-    line_data: Dict[Tuple[int, int], dict] = field(default_factory=dict)       # (from, to) -> info
-    line_list: list = field(default_factory=list)                               # ordered list of line dicts
+    node_ids: np.ndarray = field(default_factory=lambda: _empty(np.int32))     # bus IDs, ascending
+    # Lines as a struct of arrays, indexed by line idx
+    line_from: np.ndarray = field(default_factory=lambda: _empty(np.int32))
+    line_to: np.ndarray = field(default_factory=lambda: _empty(np.int32))
+    line_voltage: np.ndarray = field(default_factory=lambda: _empty(np.float64))  # kV
+    line_length: np.ndarray = field(default_factory=lambda: _empty(np.float64))   # km
+    line_active: np.ndarray = field(default_factory=lambda: _empty(np.bool_))     # in service
+    line_name: List[str] = field(default_factory=list)
+    line_power_type: List[str] = field(default_factory=list)
     ext_grid_bus: int = -1
+    _G: Optional[nx.Graph] = field(default=None, repr=False)
+    _edge_to_line: Optional[Dict[Tuple[int, int], int]] = field(default=None, repr=False)
+    
+    @property
+    def G(self) -> nx.Graph:
+        """NetworkX view of the grid, materialized from node_ids/line arrays on first use."""
+        if self._G is None:
+            G = nx.Graph()
+            G.add_nodes_from(self.node_ids.tolist())
+            G.add_edges_from(zip(self.line_from.tolist(), self.line_to.tolist()))
+            self._G = G
+        return self._G
     
     @property
     def num_buses(self):
-        return self.G.number_of_nodes()
+        return len(self.node_ids)
+    
+    @property
+    def bus_geo(self) -> Dict[int, Tuple[float, float]]:
+        """
+        bus_id -> (lon, lat) for every bus in the grid.
+        
+        Rebuilds an O(N) snapshot of bus_xy on every access, so hoist it out
+        of loops; use get_bus_geo() or bus_xy for single lookups.
+        """
+        ids = self.node_ids.tolist()
+        return dict(zip(ids, map(tuple, self.bus_xy[ids].tolist())))
     
     @property
     def num_lines(self):
-        return self.G.number_of_edges()
+        """Number of distinct bus pairs joined by a line (parallel lines count once)."""
+        if not len(self.line_from):
+            return 0
+        ends = np.sort(np.column_stack([self.line_from, self.line_to]), axis=1)
+        return len(np.unique(ends, axis=0))
+    
+    @property
+    def num_line_segments(self) -> int:
+        """Number of line segments, counting parallel lines separately."""
+        return len(self.line_from)
+    
+    def line_info(self, line_idx: int) -> dict:
+        """All attributes of one line as a dict."""
+        return {
+            'idx': line_idx,
+            'from_bus': int(self.line_from[line_idx]),
+            'to_bus': int(self.line_to[line_idx]),
+            'voltage_kv': float(self.line_voltage[line_idx]),
+            'name': self.line_name[line_idx],
+            'power_type': self.line_power_type[line_idx],
+            'length_km': float(self.line_length[line_idx]),
+            'in_service': bool(self.line_active[line_idx]),
+        }
+    
+    @property
+    def line_list(self) -> List[dict]:
+        """
+        Ordered list of line dicts.
+        
+        Rebuilds an O(N) snapshot on every access, and editing it does not
+        change the grid: use line_info() for one line and
+        set_line_in_service() to switch lines.
+        """
+        return [self.line_info(i) for i in range(self.num_line_segments)]
+    
+    @property
+    def edge_to_line(self) -> Dict[Tuple[int, int], int]:
+        """
+        (min_bus, max_bus) -> line index, built on first use; the last of any
+        parallel lines wins. Look the line up with line_info().
+        """
+        if self._edge_to_line is None:
+            lo = np.minimum(self.line_from, self.line_to).tolist()
+            hi = np.maximum(self.line_from, self.line_to).tolist()
+            self._edge_to_line = dict(zip(zip(lo, hi), range(len(lo))))
+        return self._edge_to_line
     
     def get_bus_geo(self, bus_id: int) -> Tuple[float, float]:
         """Get (lon, lat) for a bus."""
-        return self.bus_geo.get(bus_id, (77.2, 28.6))
+        i = np.searchsorted(self.node_ids, bus_id)
+        if i < len(self.node_ids) and self.node_ids[i] == bus_id:
+            return tuple(self.bus_xy[bus_id].tolist())
+        return (77.2, 28.6)
     
     def set_line_in_service(self, line_idx: int, in_service: bool):
         """Set a line's in_service status by index."""
-        if 0 <= line_idx < len(self.line_list):
-            self.line_list[line_idx]['in_service'] = in_service
+        if 0 <= line_idx < self.num_line_segments:
+            self.line_active[line_idx] = in_service
+    
+    @contextmanager
+    def line_out_of_service(self, line_idx: int):
+        """
+        Take a line out of service for the duration of a with-block, restoring
+        its previous state on exit, so contingency checks can reuse one grid
+        instead of copying it per candidate fault. Like set_line_in_service,
+        an index outside the grid's lines changes nothing.
+        """
+        if not 0 <= line_idx < self.num_line_segments:
+            yield self
+            return
+        previous = bool(self.line_active[line_idx])
+        self.line_active[line_idx] = False
+        try:
+            yield self
+        finally:
+            self.line_active[line_idx] = previous
     
     def get_active_graph(self) -> nx.Graph:
         """Return a graph with only in-service edges."""
         active = nx.Graph()
-        active.add_nodes_from(self.G.nodes())
-        for line in self.line_list:
-            if line['in_service']:
-                active.add_edge(line['from_bus'], line['to_bus'])
+        active.add_nodes_from(self.node_ids.tolist())
+        mask = self.line_active
+        active.add_edges_from(zip(self.line_from[mask].tolist(), self.line_to[mask].tolist()))
         return active
+    
+    def get_energized_mask(self) -> np.ndarray:
+        """
+        Mask over bus IDs (rows of bus_xy) of the buses reachable from
+        ext_grid_bus through in-service lines, found with a compiled BFS
+        instead of a NetworkX traversal.
+        """
+        n = len(self.bus_xy)
+        energized = np.zeros(n, dtype=np.bool_)
+        if not 0 <= self.ext_grid_bus < n:
+            return energized
+        
+        mask = self.line_active
+        adj = coo_matrix((np.ones(int(mask.sum()), dtype=np.int8),
+                          (self.line_from[mask], self.line_to[mask])),
+                         shape=(n, n)).tocsr()
+        energized[breadth_first_order(adj, self.ext_grid_bus, directed=False,
+                                      return_predecessors=False)] = True
+        return energized
+
 
+# One ';'-separated voltage value: digits and dots only, e.g. "132000" or "0.4"
+_VOLTAGE_TOKEN_RE = re.compile(r'\s*([\d.]*\d[\d.]*)\s*')
 
+
+@lru_cache(maxsize=4096)
 def parse_voltage_kv(voltage_str: str) -> float:
-    """Parse voltage string (in volts) to kV. Takes max if semicolon-separated."""
+    """
+    Parse voltage string (in volts) to kV. Takes max if semicolon-separated.
+    
+    Cached: the same handful of voltage strings repeat across most features.
+    """
     if not voltage_str:
         return 11.0
     try:
-        parts = voltage_str.split(";")
-        values = [float(p.strip()) for p in parts if p.strip().replace('.', '').isdigit()]
+        values = [float(m.group(1))
+                  for m in map(_VOLTAGE_TOKEN_RE.fullmatch, voltage_str.split(";")) if m]
         if not values:
             return 11.0
         max_v = max(values)
@@ -76,6 +219,25 @@ def parse_voltage_kv(voltage_str: str) -> float:
         return 11.0
 
 
+def _coord_keys_np(lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+    """
+    Bus keys for coordinates: lon and lat rounded to 4 decimals, packed into
+    one int64 (lon in the high 32 bits).
+    
+    Same grouping as (round(lon, 4), round(lat, 4)): scaling by 1e4 and
+    rounding agrees with round(x, 4) except within float error of a
+    half-way point, where the exact round(x, 4) is used instead.
+    """
+    x = lons * 10000.0
+    y = lats * 10000.0
+    ix = np.rint(x)
+    iy = np.rint(y)
+    for scaled, rounded, raw in ((x, ix, lons), (y, iy, lats)):
+        tie = np.flatnonzero(np.abs(np.abs(scaled - rounded) - 0.5) < 1e-6)
+        rounded[tie] = [round(round(v, 4) * 10000.0) for v in raw[tie].tolist()]
+    return (ix.astype(np.int64) << 32) | (iy.astype(np.int64) & 0xFFFFFFFF)
+
+
 def build_grid_from_geojson(classified_features: Dict[str, list],
                             max_lines: int = 5000,
                             progress_callback=None) -> GridNetwork:
@@ -94,86 +256,81 @@ def build_grid_from_geojson(classified_features: Dict[str, list],
     """
     grid = GridNetwork()
     
-    lines_feats = classified_features.get('lines', [])[:max_lines]
-    minor_feats = classified_features.get('minor_lines', [])[:100]
-    cable_feats = classified_features.get('cables', [])[:100]
+    # Capped views of each line class, iterated back to back without
+    # copying them into one combined list
+    line_sources = [(classified_features.get('lines', []), max_lines),
+                    (classified_features.get('minor_lines', []), 100),
+                    (classified_features.get('cables', []), 100)]
     sub_feats = classified_features.get('substations', [])
     
-    all_line_feats = lines_feats + minor_feats + cable_feats
-    total_feats = len(all_line_feats)
+    all_line_feats = chain.from_iterable(islice(feats, cap) for feats, cap in line_sources)
+    total_feats = sum(min(len(feats), cap) for feats, cap in line_sources)
     
     if progress_callback:
         progress_callback(0, f"Processing {total_feats} line features...")
     
     # ── Step 1: Build nodes and edges from line coordinates ──
-    coord_to_bus = {}  # (round_lon, round_lat) -> bus_id
-    bus_counter = 0
-    line_idx = 0
+    # Gather every vertex first, then assign buses to all of them at once
+    vertices = []                      # GeoJSON positions of all features, concatenated
+    feat_counts = []                   # number of positions, per entry of feat_info
+    feat_info = []                     # (feat_id, voltage_kv, power_type)
     
     for feat_i, feat in enumerate(all_line_feats):
         props = feat.get('properties', {})
         geom = feat.get('geometry', {})
         coords = geom.get('coordinates', [])
-        voltage_str = props.get('voltage', '')
-        voltage_kv = parse_voltage_kv(voltage_str)
-        power_type = props.get('power', 'line')
-        feat_id = feat.get('id', f'feat_{feat_i}')
         
         if len(coords) < 2:
             continue
         
-        # Get or create bus for each coordinate
-        line_bus_ids = []
-        for coord in coords:
-            if len(coord) < 2:
-                continue
-            lon, lat = coord[0], coord[1]
-            key = (round(lon, 4), round(lat, 4))
-            
-            if key not in coord_to_bus:
-                bid = bus_counter
-                coord_to_bus[key] = bid
-                grid.bus_geo[bid] = (lon, lat)
-                grid.bus_voltage[bid] = voltage_kv
-                grid.G.add_node(bid)
-                bus_counter += 1
-            
-            line_bus_ids.append(coord_to_bus[key])
+        voltage_kv = parse_voltage_kv(props.get('voltage', ''))
+        power_type = props.get('power', 'line')
+        feat_id = feat.get('id', f'feat_{feat_i}')
         
-        # Create edges between consecutive nodes
-        for i in range(len(line_bus_ids) - 1):
-            fb, tb = line_bus_ids[i], line_bus_ids[i + 1]
-            if fb == tb:
-                continue
-            
-            # Haversine distance
-            geo_fb = grid.bus_geo[fb]
-            geo_tb = grid.bus_geo[tb]
-            length_km = _haversine(geo_fb[1], geo_fb[0], geo_tb[1], geo_tb[0])
-            if length_km < 0.001:
-                length_km = 0.01
-            
-            line_info = {
-                'idx': line_idx,
-                'from_bus': fb,
-                'to_bus': tb,
-                'voltage_kv': voltage_kv,
-                'name': f"L_{feat_id}_{i}_{voltage_kv}kV",
-                'power_type': power_type,
-                'length_km': length_km,
-                'in_service': True,
-            }
-            
-            grid.G.add_edge(fb, tb)
-            grid.line_data[(fb, tb)] = line_info
-            grid.line_list.append(line_info)
-            line_idx += 1
+        vertices.extend(coords)
+        feat_counts.append(len(coords))
+        feat_info.append((feat_id, voltage_kv, power_type))
         
         if progress_callback and feat_i % 500 == 0:
             pct = int((feat_i / total_feats) * 70)
             progress_callback(pct, f"Processed {feat_i}/{total_feats}...")
     
-    print(f"Created {bus_counter} buses and {line_idx} line segments.")
+    vertex_feat = np.repeat(np.arange(len(feat_info), dtype=np.int64), feat_counts)
+    lonlat, usable = lonlat_positions(vertices)
+    if usable is not None:
+        vertex_feat = vertex_feat[usable]
+    
+    # Bus IDs are handed out in order of first appearance
+    keys = _coord_keys_np(lonlat[:, 0], lonlat[:, 1])
+    unique_keys, first_idx, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(first_idx)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    vertex_bus = rank[inverse.ravel()]
+    bus_counter = len(unique_keys)
+    
+    grid.bus_xy = lonlat[first_idx[order]]
+    grid.node_ids = np.arange(bus_counter, dtype=np.int32)
+    feat_voltage = np.array([info[1] for info in feat_info], dtype=np.float64)
+    grid.bus_voltage = dict(enumerate(feat_voltage[vertex_feat[first_idx[order]]].tolist()))
+    
+    # Edges join consecutive vertices of the same feature on different buses
+    same_feat = vertex_feat[1:] == vertex_feat[:-1]
+    edge_start = np.flatnonzero(same_feat & (vertex_bus[1:] != vertex_bus[:-1]))
+    edge_feat = vertex_feat[edge_start]
+    feat_start = np.searchsorted(vertex_feat, np.arange(len(feat_info)))
+    
+    grid.line_from = vertex_bus[edge_start].astype(np.int32)
+    grid.line_to = vertex_bus[edge_start + 1].astype(np.int32)
+    grid.line_voltage = np.array([feat_info[f][1] for f in edge_feat.tolist()], dtype=np.float64)
+    grid.line_name = [f"L_{feat_info[f][0]}_{i}_{feat_info[f][1]}kV"
+                      for f, i in zip(edge_feat.tolist(),
+                                      (edge_start - feat_start[edge_feat]).tolist())]
+    grid.line_power_type = [feat_info[f][2] for f in edge_feat.tolist()]
+    grid.line_length = _line_lengths(grid)
+    grid.line_active = np.ones(len(edge_start), dtype=np.bool_)
+    
+    print(f"Created {bus_counter} buses and {grid.num_line_segments} line segments.")
     
     if bus_counter == 0:
         print("ERROR: No buses created!")
@@ -183,38 +340,35 @@ def build_grid_from_geojson(classified_features: Dict[str, list],
     if progress_callback:
         progress_callback(75, "Finding largest connected component...")
     
-    if not nx.is_connected(grid.G):
-        components = list(nx.connected_components(grid.G))
-        largest_cc = max(components, key=len)
-        
-        removed_buses = set(grid.G.nodes()) - largest_cc
+    n_components, labels = _bus_components(grid, bus_counter)
+    if n_components > 1:
+        keep = labels == np.bincount(labels).argmax()
+        removed_buses = np.flatnonzero(~keep).tolist()
         
         # Remove non-largest nodes
-        grid.G.remove_nodes_from(removed_buses)
+        grid.node_ids = np.flatnonzero(keep).astype(np.int32)
         for bus_id in removed_buses:
-            grid.bus_geo.pop(bus_id, None)
             grid.bus_voltage.pop(bus_id, None)
         
-        # Filter line_list
-        grid.line_list = [l for l in grid.line_list
-                          if l['from_bus'] in largest_cc and l['to_bus'] in largest_cc]
-        
-        # Re-index lines
-        for i, line in enumerate(grid.line_list):
-            line['idx'] = i
-        
-        # Filter line_data
-        grid.line_data = {k: v for k, v in grid.line_data.items()
-                         if k[0] in largest_cc and k[1] in largest_cc}
+        # Filter lines (a line's ends are always in the same component);
+        # line indices are positions, so this also re-indexes them
+        keep_line = keep[grid.line_from]
+        grid.line_from = grid.line_from[keep_line]
+        grid.line_to = grid.line_to[keep_line]
+        grid.line_voltage = grid.line_voltage[keep_line]
+        grid.line_length = grid.line_length[keep_line]
+        grid.line_active = grid.line_active[keep_line]
+        grid.line_name = list(compress(grid.line_name, keep_line.tolist()))
+        grid.line_power_type = list(compress(grid.line_power_type, keep_line.tolist()))
         
-        print(f"Kept largest component: {len(largest_cc)} buses "
-              f"(removed {len(removed_buses)}, {len(components)} components)")
+        print(f"Kept largest component: {bus_counter - len(removed_buses)} buses "
+              f"(removed {len(removed_buses)}, {n_components} components)")
     
     # ── Step 3: Attach power source ──
     if progress_callback:
         progress_callback(90, "Attaching power source...")
     
-    grid.ext_grid_bus = _find_best_source_bus(grid, sub_feats, coord_to_bus)
+    grid.ext_grid_bus = _find_best_source_bus(grid, sub_feats)
     
     if progress_callback:
         progress_callback(100, f"Grid: {grid.num_buses} buses, {grid.num_lines} edges")
@@ -225,56 +379,112 @@ def build_grid_from_geojson(classified_features: Dict[str, list],
     return grid
 
 
+def _bus_components(grid: GridNetwork, num_buses: int) -> Tuple[int, np.ndarray]:
+    """
+    Label the connected components of the bus graph (buses are 0..num_buses-1).
+    
+    Returns:
+        (n_components, labels): labels[bus_id] is the bus's component, numbered
+        in order of each component's lowest bus ID
+    """
+    adj = coo_matrix((np.ones(grid.num_line_segments, dtype=np.int8),
+                      (grid.line_from, grid.line_to)),
+                     shape=(num_buses, num_buses)).tocsr()
+    return connected_components(adj, directed=False)
+
+
 def _find_best_source_bus(grid: GridNetwork, substation_features: list,
-                          coord_to_bus: dict) -> int:
-    """Find the best bus for the power source — prefers a substation with highest voltage."""
-    best_bus = None
-    best_voltage = 0
+                          max_distance_deg: float = 0.01) -> int:
+    """
+    Find the best bus for the power source — prefers a substation with highest voltage.
+    
+    Each substation is matched to the bus nearest its centroid (through a
+    KD-tree over the bus coordinates), provided that bus lies within
+    max_distance_deg; line endpoints rarely coincide exactly with a
+    substation's outline.
+    """
+    bus_ids = grid.node_ids.tolist()
+    tree = cKDTree(grid.bus_xy[grid.node_ids])
     
+    centroids = []
+    voltages = []
     for feat in substation_features:
         props = feat.get('properties', {})
-        voltage_str = props.get('voltage', '')
-        voltage_kv = parse_voltage_kv(voltage_str)
-        
         geom = feat.get('geometry', {})
         geom_type = geom.get('type', '')
         
         if geom_type == 'Polygon':
             ring = geom.get('coordinates', [[]])[0]
-            if ring:
-                lon, lat = ring[0][0], ring[0][1]
-            else:
+            if not ring:
                 continue
+            pts = np.asarray([c[:2] for c in ring], dtype=np.float64)
+            centroids.append(pts.mean(axis=0))
         elif geom_type == 'Point':
             coords = geom.get('coordinates', [])
-            if len(coords) >= 2:
-                lon, lat = coords[0], coords[1]
-            else:
+            if len(coords) < 2:
                 continue
+            centroids.append((coords[0], coords[1]))
         else:
             continue
-        
-        key = (round(lon, 4), round(lat, 4))
-        if key in coord_to_bus:
-            bus_id = coord_to_bus[key]
-            if bus_id in grid.G.nodes() and voltage_kv > best_voltage:
+        voltages.append(parse_voltage_kv(props.get('voltage', '')))
+    
+    best_bus = None
+    best_voltage = 0
+    if centroids:
+        dist, nearest = tree.query(np.asarray(centroids, dtype=np.float64))
+        for d, i, voltage_kv in zip(dist.tolist(), nearest.tolist(), voltages):
+            if d <= max_distance_deg and voltage_kv > best_voltage:
                 best_voltage = voltage_kv
-                best_bus = bus_id
+                best_bus = bus_ids[i]
     
     if best_bus is not None:
         print(f"Source at substation bus {best_bus} ({best_voltage} kV)")
         return best_bus
     
     # Fallback: first node in the graph
-    return list(grid.G.nodes())[0]
+    return int(grid.node_ids[0])
 
 
-def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Distance in km between two lat/lon points."""
+def _line_lengths(grid: GridNetwork) -> np.ndarray:
+    """Length in km of every line from its end buses, in one vectorized pass."""
+    if not len(grid.line_from):
+        return _empty(np.float64)
+    
+    fb, tb = grid.bus_xy[grid.line_from], grid.bus_xy[grid.line_to]  # lon, lat
+    lengths = _haversine_np(fb[:, 1], fb[:, 0], tb[:, 1], tb[:, 0])
+    lengths[lengths < 0.001] = 0.01
+    return lengths
+
+
+def _haversine_np(lat1: np.ndarray, lon1: np.ndarray,
+                  lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """
+    Distance in km between lat/lon points, elementwise over arrays.
+    
+    Works in place on a few scratch arrays (ufunc out=) rather than
+    allocating a temporary for every intermediate expression.
+    """
     R = 6371.0
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = (math.sin(dlat / 2) ** 2 +
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-         math.sin(dlon / 2) ** 2)
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    
+    a = np.subtract(phi2, phi1)
+    a *= 0.5
+    np.sin(a, out=a)
+    a *= a                                  # sin²(Δφ/2)
+    
+    t = np.subtract(lon2, lon1)
+    np.radians(t, out=t)
+    t *= 0.5
+    np.sin(t, out=t)
+    t *= t                                  # sin²(Δλ/2)
+    t *= np.cos(phi1, out=phi1)
+    t *= np.cos(phi2, out=phi2)
+    a += t
+    
+    np.subtract(1.0, a, out=t)
+    np.sqrt(t, out=t)
+    np.sqrt(a, out=a)
+    np.arctan2(a, t, out=a)
+    a *= 2 * R
+    return a
@@ -3,7 +3,7 @@ import StatusBar from './components/StatusBar';
 import ControlPanel from './components/ControlPanel';
 import MapView from './components/MapView';
 import SensorPanel from './components/SensorPanel';
-import { buildAdjacencyList, getEnergizedStatus, findGoodBridgeFault, bfsFromSource } from './simulation/gridEngine';
+import { buildCSR, getStatusWithFault, findGoodBridgeFault, countLive } from './simulation/gridEngine';
 import { placeSensorsSqrtN, readSensors, identifyFaultyBlock } from './simulation/sensorEngine';
 import './index.css';
 
@@ -18,6 +18,25 @@ const INITIAL_SIM_STATE = {
   repairMode: false,
 };
 
+// grid_data.json may store coordinates as integers scaled by coord_scale
+// (see export_grid_data.py); convert them back to degrees in place.
+// Files without coord_scale already hold degrees.
+function decodeCoords(data) {
+  const scale = data.coord_scale;
+  if (!scale) return data;
+  for (const bus of data.buses) {
+    bus[1] /= scale;
+    bus[2] /= scale;
+  }
+  for (const rows of [data.towers, data.poles, data.substations]) {
+    for (const row of rows || []) {
+      row[0] /= scale;
+      row[1] /= scale;
+    }
+  }
+  return data;
+}
+
 const INITIAL_LAYERS = {
   lines: true,
   towers: false,
@@ -34,18 +53,23 @@ export default function App() {
   const [tileLayer, setTileLayer] = useState('dark');
   const [isolateFault, setIsolateFault] = useState(false);
   const [toast, setToast] = useState(null);
-  const adjRef = useRef(null);
+  const csrRef = useRef(null);
   const allBusesRef = useRef([]);
+  const lineIdsRef = useRef([]);
+  const lineByIdRef = useRef(new Map());
 
   // Load grid data
   useEffect(() => {
     fetch('/grid_data.json')
       .then(r => r.json())
+      .then(decodeCoords)
       .then(data => {
         setGridData(data);
-        // Build adjacency list
-        adjRef.current = buildAdjacencyList(data.lines);
+        // Build CSR adjacency
+        csrRef.current = buildCSR(data.lines);
         allBusesRef.current = data.buses.map(b => b[0]);
+        lineIdsRef.current = data.lines.map(l => l[0]);
+        lineByIdRef.current = new Map(data.lines.map(l => [l[0], l]));
         showToast(`Grid loaded: ${data.stats.total_buses.toLocaleString()} buses, ${data.stats.total_lines.toLocaleString()} lines`);
       })
       .catch(err => {
@@ -62,10 +86,9 @@ export default function App() {
   // ── SIMULATION ACTIONS ──
 
   const handleEnergize = useCallback(() => {
-    if (!adjRef.current || !gridData) return;
+    if (!csrRef.current || !gridData) return;
     const t0 = performance.now();
-    const disabled = new Set();
-    const status = getEnergizedStatus(adjRef.current, gridData.ext_grid_bus, disabled, allBusesRef.current);
+    const status = getStatusWithFault(csrRef.current, gridData.ext_grid_bus, null, allBusesRef.current);
     const elapsed = (performance.now() - t0).toFixed(0);
 
     setSimState(prev => ({
@@ -78,8 +101,7 @@ export default function App() {
         ? readSensors(prev.sensors, status) : null,
     }));
 
-    let live = 0;
-    status.forEach(v => { if (v === 1) live++; });
+    const live = countLive(status);
     showToast(`⚡ Energized in ${elapsed}ms — ${live.toLocaleString()} buses live`);
   }, [gridData, showToast]);
 
@@ -96,9 +118,9 @@ export default function App() {
   }, [showToast]);
 
   const handlePlaceSensors = useCallback(() => {
-    if (!adjRef.current || !gridData) return;
+    if (!csrRef.current || !gridData) return;
     const t0 = performance.now();
-    const { sensors, blocks } = placeSensorsSqrtN(adjRef.current, gridData.ext_grid_bus);
+    const { sensors, blocks } = placeSensorsSqrtN(csrRef.current, gridData.ext_grid_bus);
     const elapsed = (performance.now() - t0).toFixed(0);
 
     setSimState(prev => {
@@ -111,17 +133,18 @@ export default function App() {
   }, [gridData, showToast]);
 
   const handleTriggerFault = useCallback((lineIdx) => {
-    if (!adjRef.current || !gridData) return;
+    if (!csrRef.current || !gridData) return;
     const t0 = performance.now();
 
-    // If no specific line, pick random in-service line
-    if (lineIdx === undefined || lineIdx === null) {
-      lineIdx = Math.floor(Math.random() * gridData.lines.length);
+    // If no specific line (e.g. the Random Fault button, which passes its
+    // click event), pick random in-service line
+    if (typeof lineIdx !== 'number') {
+      const lineIds = lineIdsRef.current;
+      lineIdx = lineIds[Math.floor(Math.random() * lineIds.length)];
     }
 
-    const line = gridData.lines.find(l => l[0] === lineIdx);
-    const disabled = new Set([lineIdx]);
-    const status = getEnergizedStatus(adjRef.current, gridData.ext_grid_bus, disabled, allBusesRef.current);
+    const line = lineByIdRef.current.get(lineIdx);
+    const status = getStatusWithFault(csrRef.current, gridData.ext_grid_bus, lineIdx, allBusesRef.current);
 
     const faultInfo = {
       lineIdx: lineIdx,
@@ -130,8 +153,7 @@ export default function App() {
       voltage: line ? line[3] : '?',
     };
 
-    let deadCount = 0;
-    status.forEach(v => { if (v === 0) deadCount++; });
+    const deadCount = allBusesRef.current.length - countLive(status);
 
     setSimState(prev => {
       const readings = prev.sensors.length > 0
@@ -156,14 +178,14 @@ export default function App() {
   }, [gridData, showToast]);
 
   const handleBridgeFault = useCallback(() => {
-    if (!adjRef.current || !gridData) return;
+    if (!csrRef.current || !gridData) return;
     showToast('🔍 Searching for bridge fault...');
 
     // Use setTimeout to not block UI
     setTimeout(() => {
       const t0 = performance.now();
       const bridgeLine = findGoodBridgeFault(
-        adjRef.current, gridData.ext_grid_bus, gridData.lines, allBusesRef.current
+        csrRef.current, gridData.ext_grid_bus, allBusesRef.current
       );
       const elapsed = (performance.now() - t0).toFixed(0);
 
@@ -177,12 +199,11 @@ export default function App() {
   }, [gridData, handleTriggerFault, showToast]);
 
   const handleRepairFault = useCallback(() => {
-    if (!adjRef.current || !gridData) return;
+    if (!csrRef.current || !gridData) return;
     const t0 = performance.now();
 
     // Recalculate status without any faults
-    const disabled = new Set();
-    const status = getEnergizedStatus(adjRef.current, gridData.ext_grid_bus, disabled, allBusesRef.current);
+    const status = getStatusWithFault(csrRef.current, gridData.ext_grid_bus, null, allBusesRef.current);
     const elapsed = (performance.now() - t0).toFixed(0);
 
     setSimState(prev => ({
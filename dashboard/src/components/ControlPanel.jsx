@@ -14,6 +14,16 @@ import {
     TowerControl
 } from 'lucide-react';
 
+// Static layer toggle list, built once rather than on every render
+const LAYER_TOGGLES = [
+    { key: 'lines', label: 'Lines & Cables' },
+    { key: 'towers', label: 'Towers' },
+    { key: 'poles', label: 'Poles' },
+    { key: 'substations', label: 'Substations' },
+    { key: 'sensors', label: 'Sensors' },
+    { key: 'source', label: 'Power Source' },
+];
+
 export default function ControlPanel({
     gridData, simState, onEnergize, onDeenergize, onPlaceSensors,
     onTriggerFault, onTriggerBridgeFault, onRepairFault, onReset, layers, onToggleLayer,
@@ -55,14 +65,7 @@ export default function ControlPanel({
                 <div className="section-title">
                     <Layers size={12} style={{ marginRight: 6 }} /> Layers
                 </div>
-                {[
-                    { key: 'lines', label: 'Lines & Cables' },
-                    { key: 'towers', label: 'Towers' },
-                    { key: 'poles', label: 'Poles' },
-                    { key: 'substations', label: 'Substations' },
-                    { key: 'sensors', label: 'Sensors' },
-                    { key: 'source', label: 'Power Source' },
-                ].map(({ key, label }) => (
+                {LAYER_TOGGLES.map(({ key, label }) => (
                     <div key={key} className={`toggle-row ${layers[key] ? 'active' : ''}`}>
                         <span className="toggle-label">{label}</span>
                         <div
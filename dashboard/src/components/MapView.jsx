@@ -1,5 +1,6 @@
-import React, { useEffect, useRef, useMemo } from 'react';
-import { MapContainer, TileLayer, useMap, CircleMarker, Polyline, Tooltip } from 'react-leaflet';
+import React, { useEffect, useLayoutEffect, useRef, useMemo } from 'react';
+import { MapContainer, TileLayer, useMap, CircleMarker, Tooltip } from 'react-leaflet';
+import L from 'leaflet';
 import 'leaflet/dist/leaflet.css';
 
 const TILES = {
@@ -32,19 +33,94 @@ const VOLTAGE_COLORS = {
     11: '#AA00FF',
 };
 
+// Color bands for line voltages, highest first: a line takes the color
+// of the first band whose lower bound it reaches
+const VOLTAGE_BANDS = [765, 400, 220, 132, 110, 66, 33, 22, 11]
+    .map(minKv => [minKv, VOLTAGE_COLORS[minKv]]);
+
 function getVoltageColor(kv) {
-    if (kv >= 765) return VOLTAGE_COLORS[765];
-    if (kv >= 400) return VOLTAGE_COLORS[400];
-    if (kv >= 220) return VOLTAGE_COLORS[220];
-    if (kv >= 132) return VOLTAGE_COLORS[132];
-    if (kv >= 110) return VOLTAGE_COLORS[110];
-    if (kv >= 66) return VOLTAGE_COLORS[66];
-    if (kv >= 33) return VOLTAGE_COLORS[33];
-    if (kv >= 22) return VOLTAGE_COLORS[22];
-    if (kv >= 11) return VOLTAGE_COLORS[11];
+    for (const [minKv, color] of VOLTAGE_BANDS) {
+        if (kv >= minKv) return color;
+    }
     return '#666666';
 }
 
+// Static legend: built once at module load, so re-renders of the map
+// (every energize / fault / sensor update) don't rebuild it
+const VOLTAGE_LEGEND = [
+    ['765+ kV', '#FF1744'],
+    ['400 kV', '#FF6D00'],
+    ['220 kV', '#FFD600'],
+    ['132 kV', '#76FF03'],
+    ['110 kV', '#00E676'],
+    ['66 kV', '#00B0FF'],
+    ['33 kV', '#2979FF'],
+    ['11 kV', '#AA00FF'],
+];
+
+const MAP_LEGEND = (
+    <div className="map-legend">
+        <div className="legend-title">Voltage</div>
+        {VOLTAGE_LEGEND.map(([label, color]) => (
+            <div key={label} className="legend-item">
+                <div className="legend-line" style={{ background: color }} />
+                <span>{label}</span>
+            </div>
+        ))}
+        <div style={{ marginTop: 6 }} />
+        <div className="legend-item">
+            <div className="legend-dot" style={{ background: '#00E676' }} />
+            <span>Sensor Live</span>
+        </div>
+        <div className="legend-item">
+            <div className="legend-dot" style={{ background: '#FF1744' }} />
+            <span>Sensor Dead</span>
+        </div>
+        <div className="legend-item">
+            <div className="legend-line" style={{ background: '#FF0000', height: 2, borderTop: '1px dashed #FF0000' }} />
+            <span>Fault Line</span>
+        </div>
+    </div>
+);
+
+// Marker styles are shared module-level objects: react-leaflet calls
+// setStyle() on a layer whenever its pathOptions object changes identity,
+// so a fresh literal per marker would restyle every marker on each render
+// (and PointLayer rebuilds its markers when its style changes)
+const TOWER_STYLE = { color: '#666', fillColor: '#888', fillOpacity: 0.6, weight: 1 };
+const POLE_STYLE = { color: '#555', fillColor: '#777', fillOpacity: 0.5, weight: 1 };
+const SUBSTATION_STYLE = { color: '#888', fillColor: '#DDD', fillOpacity: 0.8, weight: 1 };
+const SENSOR_LIVE_STYLE = { color: '#00E676', fillColor: '#00E676', fillOpacity: 0.9, weight: 2 };
+const SENSOR_DEAD_STYLE = { color: '#FF1744', fillColor: '#FF1744', fillOpacity: 0.9, weight: 2 };
+const SOURCE_STYLE = { color: '#E040FB', fillColor: '#E040FB', fillOpacity: 1, weight: 2 };
+
+// Bus coordinates as one flat array indexed by bus ID (IDs are small
+// non-negative ints): lon at 2 * id, lat at 2 * id + 1, NaN for IDs that
+// are not in the grid. Also returns the mean bus position for centering.
+function buildBusLonLat(buses) {
+    let maxId = -1;
+    for (const bus of buses) if (bus[0] > maxId) maxId = bus[0];
+    const lonLat = new Float64Array(2 * (maxId + 1)).fill(NaN);
+    let sumLon = 0, sumLat = 0;
+    for (const [id, lon, lat] of buses) {
+        lonLat[2 * id] = lon;
+        lonLat[2 * id + 1] = lat;
+        sumLon += lon;
+        sumLat += lat;
+    }
+    const center = buses.length > 0
+        ? [sumLat / buses.length, sumLon / buses.length]
+        : [22.5, 78.5]; // India center
+    return { lonLat, center };
+}
+
+// [lon, lat] of a bus, or null if it is not in the grid
+function busGeo(lonLat, busId) {
+    const lon = lonLat[2 * busId];
+    if (lon === undefined || Number.isNaN(lon)) return null;
+    return [lon, lonLat[2 * busId + 1]];
+}
+
 // Component to dynamically change tile layer
 function TileLayerSwitcher({ tileLayer }) {
     const map = useMap();
@@ -54,7 +130,6 @@ function TileLayerSwitcher({ tileLayer }) {
         if (tileRef.current) {
             map.removeLayer(tileRef.current);
         }
-        const L = window.L || require('leaflet');
         const tileConfig = TILES[tileLayer] || TILES.dark;
         const layer = L.tileLayer(tileConfig.url, {
             attribution: tileConfig.attr,
@@ -72,195 +147,244 @@ function TileLayerSwitcher({ tileLayer }) {
 }
 
 // Render transmission lines
-function LineLayer({ gridData, simState, busGeoMap, isolateFault, onTriggerFault }) {
+//
+// Lines bypass react-leaflet: one Leaflet polyline per line is created
+// directly from the compact line arrays once per grid, and simulation
+// updates only restyle (or, in isolation mode, detach) those paths in
+// place. No React element or GeoJSON feature is built per line.
+function lineTooltip(line, faulted) {
+    const [idx, fromBus, toBus, kv] = line;
+    return `<div style="font-size: 12px; font-family: Inter, sans-serif">` +
+        `<strong>Line ${idx}</strong><br />` +
+        (faulted ? `<span style="color: #FF1744">⚠️ FAULTED</span>` : `<span>${kv} kV</span>`) +
+        `<br />Bus ${fromBus} ➝ Bus ${toBus}` +
+        (faulted ? '' : `<div style="margin-top: 4px; font-size: 10px; color: #aaa">(Click to fault)</div>`) +
+        `</div>`;
+}
+
+const LINE_FAULT_STYLE = { color: '#FF0000', weight: 3, opacity: 1, dashArray: '8 4' };
+const LINE_DEAD_STYLE = { color: '#2a2a2a', weight: 1, opacity: 0.3, dashArray: null };
+const LINE_IDLE_STYLE = { color: '#333', weight: 1, opacity: 0.4, dashArray: null };
+
+// Live styles depend only on the voltage, and a grid has a handful of
+// distinct voltages, so each is built once and shared by all its lines
+const liveLineStyles = new Map();
+
+function liveLineStyle(kv) {
+    let style = liveLineStyles.get(kv);
+    if (!style) {
+        style = { color: getVoltageColor(kv), weight: kv >= 220 ? 2 : 1, opacity: 0.7, dashArray: null };
+        liveLineStyles.set(kv, style);
+    }
+    return style;
+}
+
+function LineLayer({ gridData, simState, busLonLat, isolateFault, onTriggerFault }) {
+    const map = useMap();
     const { energized, energizedStatus, faultInfo } = simState;
+    const faultLine = faultInfo ? faultInfo.lineIdx : null;
+
+    // Handlers bound once per path read the latest values through refs
+    const faultLineRef = useRef(faultLine);
+    const onTriggerFaultRef = useRef(onTriggerFault);
+    useLayoutEffect(() => {
+        faultLineRef.current = faultLine;
+        onTriggerFaultRef.current = onTriggerFault;
+    }, [faultLine, onTriggerFault]);
 
-    return useMemo(() => {
-        if (!gridData) return null;
-        const lines = gridData.lines;
-        const elements = [];
+    // The current grid's layer group, its { path, line } pairs, and the
+    // style last applied to each path
+    const layerRef = useRef(null);
 
-        for (let i = 0; i < lines.length; i++) {
-            const [idx, fromBus, toBus, kv] = lines[i];
-            const fromGeo = busGeoMap.get(fromBus);
-            const toGeo = busGeoMap.get(toBus);
+    useEffect(() => {
+        const group = L.layerGroup().addTo(map);
+        const paths = [];
+        for (const line of gridData.lines) {
+            const [idx, fromBus, toBus] = line;
+            const fromGeo = busGeo(busLonLat, fromBus);
+            const toGeo = busGeo(busLonLat, toBus);
             if (!fromGeo || !toGeo) continue;
 
-            const isFaulted = faultInfo && faultInfo.lineIdx === idx;
+            const path = L.polyline([[fromGeo[1], fromGeo[0]], [toGeo[1], toGeo[0]]]);
+            path.bindTooltip(() => lineTooltip(line, idx === faultLineRef.current), { sticky: true });
+            path.on('click', () => {
+                if (onTriggerFaultRef.current) onTriggerFaultRef.current(idx);
+            });
+            paths.push({ path, line });
+        }
+        layerRef.current = { group, paths, appliedStyles: new Map() };
+        return () => {
+            group.remove();
+            layerRef.current = null;
+        };
+    }, [map, gridData, busLonLat]);
 
-            // If isolation mode is on, skip non-faulted lines
-            if (isolateFault && !isFaulted) continue;
+    // Declared after the build effect so it runs on the freshly built paths
+    useEffect(() => {
+        const { group, paths, appliedStyles } = layerRef.current;
+        for (const { path, line } of paths) {
+            const [idx, fromBus, toBus, kv] = line;
+            const isFaulted = idx === faultLine;
 
-            let color = '#333';
-            let weight = 1;
-            let opacity = 0.4;
-            let dashArray = null;
+            // If isolation mode is on, detach non-faulted lines
+            if (isolateFault && !isFaulted) {
+                group.removeLayer(path);
+                continue;
+            }
 
+            let style;
             if (isFaulted) {
-                color = '#FF0000';
-                weight = 3;
-                opacity = 1;
-                dashArray = '8 4';
+                style = LINE_FAULT_STYLE;
             } else if (energized) {
-                const fromLive = energizedStatus ? (energizedStatus.get(fromBus) || 0) : 1;
-                const toLive = energizedStatus ? (energizedStatus.get(toBus) || 0) : 1;
-                if (fromLive && toLive) {
-                    color = getVoltageColor(kv);
-                    weight = kv >= 220 ? 2 : 1;
-                    opacity = 0.7;
-                } else {
-                    color = '#2a2a2a';
-                    weight = 1;
-                    opacity = 0.3;
-                }
+                const fromLive = energizedStatus ? (energizedStatus[fromBus] || 0) : 1;
+                const toLive = energizedStatus ? (energizedStatus[toBus] || 0) : 1;
+                style = fromLive && toLive ? liveLineStyle(kv) : LINE_DEAD_STYLE;
+            } else {
+                style = LINE_IDLE_STYLE;
             }
 
-            elements.push(
-                <Polyline
-                    key={idx}
-                    positions={[[fromGeo[1], fromGeo[0]], [toGeo[1], toGeo[0]]]}
-                    pathOptions={{ color, weight, opacity, dashArray }}
-                    eventHandlers={{
-                        click: () => {
-                            if (onTriggerFault) onTriggerFault(idx);
-                        }
-                    }}
-                >
-                    <Tooltip sticky>
-                        <div style={{ fontSize: '12px', fontFamily: 'Inter, sans-serif' }}>
-                            <strong>Line {idx}</strong><br />
-                            {isFaulted ? <span style={{ color: '#FF1744' }}>⚠️ FAULTED</span> : <span>{kv} kV</span>}<br />
-                            Bus {fromBus} ➝ Bus {toBus}
-                            {!isFaulted && <div style={{ marginTop: 4, fontSize: 10, color: '#aaa' }}>(Click to fault)</div>}
-                        </div>
-                    </Tooltip>
-                </Polyline>
-            );
+            // Styles are shared objects, so an unchanged line is skipped
+            // rather than restyled and redrawn
+            if (appliedStyles.get(path) !== style) {
+                path.setStyle(style);
+                appliedStyles.set(path, style);
+            }
+            group.addLayer(path);
         }
+    }, [map, gridData, busLonLat, energized, energizedStatus, faultLine, isolateFault]);
 
-        return <>{elements}</>;
-    }, [gridData, energized, energizedStatus, faultInfo, busGeoMap, isolateFault, onTriggerFault]);
+    return null;
+}
+
+// Render static point features (towers, poles, substations)
+//
+// Each feature list becomes one Leaflet layer group of circle markers,
+// built once per data array straight from the compact [lon, lat, ...]
+// rows, rather than a React CircleMarker + Tooltip per point that is
+// reconciled on every simulation update. Tooltip HTML is only rendered
+// when a tooltip opens.
+function escapeHtml(text) {
+    return String(text).replace(/[&<>"']/g, c => `&#${c.charCodeAt(0)};`);
+}
+
+const towerTooltip = ([lon, lat]) => `Tower<br />${lat.toFixed(4)}, ${lon.toFixed(4)}`;
+const poleTooltip = ([lon, lat]) => `Pole<br />${lat.toFixed(4)}, ${lon.toFixed(4)}`;
+const substationTooltip = ([, , voltage, name]) =>
+    `<div style="font-family: Inter, sans-serif; font-size: 11px">` +
+    `<strong>${escapeHtml(name)}</strong><br />` +
+    `${voltage ? escapeHtml(voltage) : 'Unknown Voltage'}</div>`;
+const hasName = (row) => Boolean(row[3]);
+
+function PointLayer({ rows, radius, style, tooltip, hasTooltip }) {
+    const map = useMap();
+
+    const group = useMemo(() => {
+        const g = L.layerGroup();
+        for (const row of rows) {
+            const marker = L.circleMarker([row[1], row[0]], { ...style, radius });
+            if (!hasTooltip || hasTooltip(row)) marker.bindTooltip(() => tooltip(row));
+            g.addLayer(marker);
+        }
+        return g;
+    }, [rows, radius, style, tooltip, hasTooltip]);
+
+    useEffect(() => {
+        group.addTo(map);
+        return () => { group.remove(); };
+    }, [map, group]);
+
+    return null;
 }
 
-// Render tower markers
 function TowerLayer({ gridData }) {
     if (!gridData || !gridData.towers) return null;
-    return (
-        <>
-            {gridData.towers.map(([lon, lat], i) => (
-                <CircleMarker
-                    key={`t${i}`}
-                    center={[lat, lon]}
-                    radius={3}
-                    pathOptions={{ color: '#666', fillColor: '#888', fillOpacity: 0.6, weight: 1 }}
-                >
-                    <Tooltip>
-                        Tower<br />
-                        {lat.toFixed(4)}, {lon.toFixed(4)}
-                    </Tooltip>
-                </CircleMarker>
-            ))}
-        </>
-    );
+    return <PointLayer rows={gridData.towers} radius={3} style={TOWER_STYLE} tooltip={towerTooltip} />;
 }
 
-// Render pole markers
 function PoleLayer({ gridData }) {
     if (!gridData || !gridData.poles) return null;
-    return (
-        <>
-            {gridData.poles.map(([lon, lat], i) => (
-                <CircleMarker
-                    key={`p${i}`}
-                    center={[lat, lon]}
-                    radius={2}
-                    pathOptions={{ color: '#555', fillColor: '#777', fillOpacity: 0.5, weight: 1 }}
-                >
-                    <Tooltip>
-                        Pole<br />
-                        {lat.toFixed(4)}, {lon.toFixed(4)}
-                    </Tooltip>
-                </CircleMarker>
-            ))}
-        </>
-    );
+    return <PointLayer rows={gridData.poles} radius={2} style={POLE_STYLE} tooltip={poleTooltip} />;
 }
 
-// Render substations
 function SubstationLayer({ gridData }) {
     if (!gridData || !gridData.substations) return null;
     return (
-        <>
-            {gridData.substations.map(([lon, lat, voltage, name], i) => (
-                <CircleMarker
-                    key={`s${i}`}
-                    center={[lat, lon]}
-                    radius={3}
-                    pathOptions={{ color: '#888', fillColor: '#DDD', fillOpacity: 0.8, weight: 1 }}
-                >
-                    {name && (
-                        <Tooltip>
-                            <div style={{ fontFamily: 'Inter, sans-serif', fontSize: '11px' }}>
-                                <strong>{name}</strong><br />
-                                {voltage ? `${voltage}` : 'Unknown Voltage'}
-                            </div>
-                        </Tooltip>
-                    )}
-                </CircleMarker>
-            ))}
-        </>
+        <PointLayer
+            rows={gridData.substations}
+            radius={3}
+            style={SUBSTATION_STYLE}
+            tooltip={substationTooltip}
+            hasTooltip={hasName}
+        />
     );
 }
 
 // Render sensor markers
-function SensorLayer({ simState, busGeoMap }) {
+//
+// Markers are created once per sensor placement; new readings only flip
+// each marker between the shared live/dead styles
+function SensorLayer({ simState, busLonLat }) {
+    const map = useMap();
     const { sensors, sensorReadings } = simState;
-    if (!sensors || sensors.length === 0) return null;
 
-    return (
-        <>
-            {sensors.map((busId, i) => {
-                const geo = busGeoMap.get(busId);
-                if (!geo) return null;
-                const isLive = sensorReadings ? (sensorReadings.get(busId) || 0) === 1 : true;
-                const color = isLive ? '#00E676' : '#FF1744';
-
-                return (
-                    <CircleMarker
-                        key={`sen${i}`}
-                        center={[geo[1], geo[0]]}
-                        radius={5}
-                        pathOptions={{
-                            color: color,
-                            fillColor: color,
-                            fillOpacity: 0.9,
-                            weight: 2,
-                        }}
-                    >
-                        <Tooltip>Sensor S{i + 1} | Bus {busId} | {isLive ? 'LIVE' : 'DEAD'}</Tooltip>
-                    </CircleMarker>
-                );
-            })}
-        </>
-    );
+    // Tooltips bound once per marker read the latest readings through a ref
+    const readingsRef = useRef(sensorReadings);
+    useLayoutEffect(() => {
+        readingsRef.current = sensorReadings;
+    }, [sensorReadings]);
+
+    // The current placement's { marker, index } pairs and the style last
+    // applied to each marker
+    const layerRef = useRef(null);
+
+    useEffect(() => {
+        const markers = [];
+        sensors.forEach((busId, i) => {
+            const geo = busGeo(busLonLat, busId);
+            if (!geo) return;
+            const marker = L.circleMarker([geo[1], geo[0]], { ...SENSOR_LIVE_STYLE, radius: 5 });
+            marker.bindTooltip(() => {
+                const readings = readingsRef.current;
+                const isLive = readings ? readings[i] === 1 : true;
+                return `Sensor S${i + 1} | Bus ${busId} | ${isLive ? 'LIVE' : 'DEAD'}`;
+            });
+            markers.push({ marker, index: i });
+        });
+        const group = L.layerGroup(markers.map(m => m.marker)).addTo(map);
+        layerRef.current = { markers, appliedStyles: new Map() };
+        return () => {
+            group.remove();
+            layerRef.current = null;
+        };
+    }, [map, sensors, busLonLat]);
+
+    // Declared after the build effect so it runs on the freshly built markers
+    useEffect(() => {
+        const { markers, appliedStyles } = layerRef.current;
+        for (const { marker, index } of markers) {
+            const isLive = sensorReadings ? sensorReadings[index] === 1 : true;
+            const style = isLive ? SENSOR_LIVE_STYLE : SENSOR_DEAD_STYLE;
+            if (appliedStyles.get(marker) !== style) {
+                marker.setStyle(style);
+                appliedStyles.set(marker, style);
+            }
+        }
+    }, [map, sensors, busLonLat, sensorReadings]);
+
+    return null;
 }
 
 // Render power source marker
-function SourceMarker({ gridData, busGeoMap }) {
+function SourceMarker({ gridData, busLonLat }) {
     if (!gridData) return null;
-    const geo = busGeoMap.get(gridData.ext_grid_bus);
+    const geo = busGeo(busLonLat, gridData.ext_grid_bus);
     if (!geo) return null;
 
     return (
         <CircleMarker
             center={[geo[1], geo[0]]}
             radius={6}
-            pathOptions={{
-                color: '#E040FB',
-                fillColor: '#E040FB',
-                fillOpacity: 1,
-                weight: 2,
-            }}
+            pathOptions={SOURCE_STYLE}
         >
             <Tooltip>Power Source (Bus {gridData.ext_grid_bus})</Tooltip>
         </CircleMarker>
@@ -268,32 +392,11 @@ function SourceMarker({ gridData, busGeoMap }) {
 }
 
 export default function MapView({ gridData, simState, layers, tileLayer, isolateFault, onTriggerFault }) {
-    // Build bus geo lookup
-    const busGeoMap = useMemo(() => {
-        const m = new Map();
-        if (gridData) {
-            for (const [id, lon, lat] of gridData.buses) {
-                m.set(id, [lon, lat]);
-            }
-        }
-        return m;
-    }, [gridData]);
-
-    // Default center on India
-    const center = useMemo(() => {
-        if (gridData && gridData.buses.length > 0) {
-            let sumLat = 0, sumLon = 0, count = 0;
-            // Sample 500 buses for center
-            const step = Math.max(1, Math.floor(gridData.buses.length / 500));
-            for (let i = 0; i < gridData.buses.length; i += step) {
-                sumLon += gridData.buses[i][1];
-                sumLat += gridData.buses[i][2];
-                count++;
-            }
-            return [sumLat / count, sumLon / count];
-        }
-        return [22.5, 78.5]; // India center
-    }, [gridData]);
+    // Build bus geo lookup and map center
+    const { lonLat: busLonLat, center } = useMemo(
+        () => buildBusLonLat(gridData ? gridData.buses : []),
+        [gridData]
+    );
 
     if (!gridData) {
         return (
@@ -321,7 +424,7 @@ export default function MapView({ gridData, simState, layers, tileLayer, isolate
                     <LineLayer
                         gridData={gridData}
                         simState={simState}
-                        busGeoMap={busGeoMap}
+                        busLonLat={busLonLat}
                         isolateFault={isolateFault}
                         onTriggerFault={onTriggerFault}
                     />
@@ -329,42 +432,12 @@ export default function MapView({ gridData, simState, layers, tileLayer, isolate
                 {layers.towers && <TowerLayer gridData={gridData} />}
                 {layers.poles && <PoleLayer gridData={gridData} />}
                 {layers.substations && <SubstationLayer gridData={gridData} />}
-                {layers.sensors && <SensorLayer simState={simState} busGeoMap={busGeoMap} />}
-                {layers.source && <SourceMarker gridData={gridData} busGeoMap={busGeoMap} />}
+                {layers.sensors && <SensorLayer simState={simState} busLonLat={busLonLat} />}
+                {layers.source && <SourceMarker gridData={gridData} busLonLat={busLonLat} />}
             </MapContainer>
 
             {/* Voltage Legend */}
-            <div className="map-legend">
-                <div className="legend-title">Voltage</div>
-                {[
-                    ['765+ kV', '#FF1744'],
-                    ['400 kV', '#FF6D00'],
-                    ['220 kV', '#FFD600'],
-                    ['132 kV', '#76FF03'],
-                    ['110 kV', '#00E676'],
-                    ['66 kV', '#00B0FF'],
-                    ['33 kV', '#2979FF'],
-                    ['11 kV', '#AA00FF'],
-                ].map(([label, color]) => (
-                    <div key={label} className="legend-item">
-                        <div className="legend-line" style={{ background: color }} />
-                        <span>{label}</span>
-                    </div>
-                ))}
-                <div style={{ marginTop: 6 }} />
-                <div className="legend-item">
-                    <div className="legend-dot" style={{ background: '#00E676' }} />
-                    <span>Sensor Live</span>
-                </div>
-                <div className="legend-item">
-                    <div className="legend-dot" style={{ background: '#FF1744' }} />
-                    <span>Sensor Dead</span>
-                </div>
-                <div className="legend-item">
-                    <div className="legend-line" style={{ background: '#FF0000', height: 2, borderTop: '1px dashed #FF0000' }} />
-                    <span>Fault Line</span>
-                </div>
-            </div>
+            {MAP_LEGEND}
         </div>
     );
 }
@@ -1,5 +1,6 @@
 import React from 'react';
 import { Radio, AlertTriangle, CheckCircle, XCircle } from 'lucide-react';
+import { countLive } from '../simulation/gridEngine';
 
 export default function SensorPanel({ simState }) {
     const { sensors, sensorReadings, blocks, faultyBlock } = simState;
@@ -23,10 +24,8 @@ export default function SensorPanel({ simState }) {
 
     let liveSensors = 0, deadSensors = 0;
     if (sensorReadings) {
-        sensorReadings.forEach((v) => {
-            if (v === 1) liveSensors++;
-            else deadSensors++;
-        });
+        liveSensors = countLive(sensorReadings);
+        deadSensors = sensorReadings.length - liveSensors;
     }
 
     return (
@@ -99,7 +98,7 @@ export default function SensorPanel({ simState }) {
 
             <div className="sensor-list">
                 {sensors.map((busId, i) => {
-                    const isLive = sensorReadings ? (sensorReadings.get(busId) || 0) === 1 : true;
+                    const isLive = sensorReadings ? sensorReadings[i] === 1 : true;
                     const isFaultBlock = faultyBlock === i;
                     const blockSize = blocks && blocks[i] ? blocks[i].length : 0;
 
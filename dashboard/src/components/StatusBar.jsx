@@ -1,5 +1,6 @@
 import React from 'react';
 import { Zap, Activity, Radio, AlertTriangle, Cpu } from 'lucide-react';
+import { countLive } from '../simulation/gridEngine';
 
 export default function StatusBar({ gridData, simState }) {
     const { energized, sensors, sensorReadings, faultInfo, faultyBlock } = simState;
@@ -9,18 +10,14 @@ export default function StatusBar({ gridData, simState }) {
 
     let liveBuses = 0, deadBuses = 0;
     if (simState.energizedStatus) {
-        simState.energizedStatus.forEach((v) => {
-            if (v === 1) liveBuses++;
-            else deadBuses++;
-        });
+        liveBuses = countLive(simState.energizedStatus);
+        deadBuses = totalBuses - liveBuses;
     }
 
     let liveSensors = 0, deadSensors = 0;
     if (sensorReadings) {
-        sensorReadings.forEach((v) => {
-            if (v === 1) liveSensors++;
-            else deadSensors++;
-        });
+        liveSensors = countLive(sensorReadings);
+        deadSensors = sensorReadings.length - liveSensors;
     }
 
     return (
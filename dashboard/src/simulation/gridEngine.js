@@ -1,146 +1,244 @@
 /**
  * Grid Simulation Engine
  * 
- * Client-side graph simulation using BFS/DFS.
- * Builds an adjacency list from line data and computes
+ * Client-side graph simulation using DFS.
+ * Builds a CSR adjacency from line data and computes
  * energization status via graph reachability.
  */
 
 /**
- * Build adjacency list from line data.
+ * Build a compressed sparse row (CSR) adjacency from line data.
+ *
+ * Buses are renumbered 0..n-1 in order of first appearance; the neighbors
+ * of bus i are indices[indptr[i] .. indptr[i+1]) and the line carrying each
+ * of those edges is lineIdx[k]. Each bus lists its lines in input order.
  * @param {Array} lines - [[idx, from, to, kv, name], ...]
- * @returns {Map<number, Array<{to: number, lineIdx: number}>>}
+ * @returns {{ ids: number[], index: Map<number, number>, indptr: Int32Array,
+ *             indices: Int32Array, lineIdx: Int32Array }}
  */
-export function buildAdjacencyList(lines) {
-    const adj = new Map();
-    for (const [idx, from, to] of lines) {
-        if (!adj.has(from)) adj.set(from, []);
-        if (!adj.has(to)) adj.set(to, []);
-        adj.get(from).push({ to, lineIdx: idx });
-        adj.get(to).push({ to: from, lineIdx: idx });
+export function buildCSR(lines) {
+    const index = new Map();
+    const ids = [];
+    const intern = (busId) => {
+        let i = index.get(busId);
+        if (i === undefined) {
+            i = ids.length;
+            index.set(busId, i);
+            ids.push(busId);
+        }
+        return i;
+    };
+
+    const m = lines.length;
+    const from = new Int32Array(m);
+    const to = new Int32Array(m);
+    for (let e = 0; e < m; e++) {
+        from[e] = intern(lines[e][1]);
+        to[e] = intern(lines[e][2]);
+    }
+
+    const n = ids.length;
+    const indptr = new Int32Array(n + 1);
+    for (let e = 0; e < m; e++) {
+        indptr[from[e] + 1]++;
+        indptr[to[e] + 1]++;
+    }
+    for (let i = 0; i < n; i++) indptr[i + 1] += indptr[i];
+
+    const indices = new Int32Array(2 * m);
+    const lineIdx = new Int32Array(2 * m);
+    const cursor = indptr.slice(0, n);
+    for (let e = 0; e < m; e++) {
+        const a = from[e], b = to[e], idx = lines[e][0];
+        indices[cursor[a]] = b;
+        lineIdx[cursor[a]++] = idx;
+        indices[cursor[b]] = a;
+        lineIdx[cursor[b]++] = idx;
     }
-    return adj;
+
+    return { ids, index, indptr, indices, lineIdx };
 }
 
 /**
- * BFS from source through active edges only.
- * @param {Map} adj - adjacency list
- * @param {number} source - source bus ID
- * @param {Set<number>} disabledLines - set of faulted line indices
- * @returns {Set<number>} reachable bus IDs
+ * Status array for allBuses, indexed by bus ID: 1 where live(busId) holds,
+ * 0 elsewhere (including IDs that are not in allBuses).
  */
-export function bfsFromSource(adj, source, disabledLines) {
-    const visited = new Set();
-    const queue = [source];
-    visited.add(source);
-
-    while (queue.length > 0) {
-        const current = queue.shift();
-        const neighbors = adj.get(current) || [];
-        for (const { to, lineIdx } of neighbors) {
-            if (!visited.has(to) && !disabledLines.has(lineIdx)) {
-                visited.add(to);
-                queue.push(to);
-            }
-        }
-    }
-    return visited;
+function makeStatus(allBuses, live) {
+    let maxId = -1;
+    for (const busId of allBuses) if (busId > maxId) maxId = busId;
+    const status = new Uint8Array(maxId + 1);
+    for (const busId of allBuses) if (live(busId)) status[busId] = 1;
+    return status;
 }
 
 /**
- * Get energized status for all buses.
- * @returns {Map<number, number>} busId -> 1 (live) or 0 (dead)
+ * Number of live buses in a status array.
  */
-export function getEnergizedStatus(adj, source, disabledLines, allBuses) {
-    const reachable = bfsFromSource(adj, source, disabledLines);
-    const status = new Map();
-    for (const busId of allBuses) {
-        status.set(busId, reachable.has(busId) ? 1 : 0);
-    }
-    return status;
+export function countLive(status) {
+    let live = 0;
+    for (let i = 0; i < status.length; i++) live += status[i];
+    return live;
 }
 
 /**
- * Find bridge edges using Tarjan's algorithm.
- * Handles multigraphs (parallel lines) by tracking edge IDs.
+ * Iterative Tarjan lowlink DFS over a CSR graph from one start bus.
+ * Handles multigraphs (parallel lines) by tracking edge IDs, so a parallel
+ * line counts as a back edge rather than the tree edge itself.
+ * @returns {{ bridges: number[], below: number[], disc: Int32Array,
+ *             order: Int32Array, size: Int32Array, reached: number }}
+ *   bridges: line indices of the bridges found; below[i]: CSR node on the far
+ *   side of bridges[i] from start; disc[v] / order: discovery time of v and
+ *   its inverse; size[v]: buses in v's DFS subtree, which occupies
+ *   order[disc[v] .. disc[v] + size[v]) (for a bridge, exactly the buses it
+ *   cuts off); reached: buses reachable from start
  */
-export function findBridges(adj, lines) {
-    const visited = new Set();
-    const disc = new Map();
-    const low = new Map();
+function lowlinkDfs(csr, start) {
+    const { indptr, indices, lineIdx } = csr;
+    const n = csr.ids.length;
+    const disc = new Int32Array(n).fill(-1);
+    const low = new Int32Array(n);
+    const size = new Int32Array(n);
+    const parentLine = new Int32Array(n);
+    const cursor = new Int32Array(n);
+    const order = new Int32Array(n);
     const bridges = [];
+    const below = [];
     let timer = 0;
 
-    function dfs(u, parentLineIdx) {
-        visited.add(u);
-        disc.set(u, timer);
-        low.set(u, timer);
-        timer++;
-
-        const neighbors = adj.get(u) || [];
-        for (const { to: v, lineIdx } of neighbors) {
-            if (lineIdx === parentLineIdx) continue; // Don't go back up the same edge
-
-            if (visited.has(v)) {
-                low.set(u, Math.min(low.get(u), disc.get(v)));
-            } else {
-                dfs(v, lineIdx);
-                low.set(u, Math.min(low.get(u), low.get(v)));
-                if (low.get(v) > disc.get(u)) {
-                    bridges.push(lineIdx);
-                }
+    const visit = (v, viaLine) => {
+        order[timer] = v;
+        disc[v] = low[v] = timer++;
+        size[v] = 1;
+        parentLine[v] = viaLine;
+        cursor[v] = indptr[v];
+        stack.push(v);
+    };
+    const stack = [];
+    visit(start, -1);
+
+    while (stack.length > 0) {
+        const u = stack[stack.length - 1];
+        if (cursor[u] < indptr[u + 1]) {
+            const k = cursor[u]++;
+            if (lineIdx[k] === parentLine[u]) continue; // Don't go back up the same edge
+            const v = indices[k];
+            if (disc[v] === -1) {
+                visit(v, lineIdx[k]);
+            } else if (disc[v] < low[u]) {
+                low[u] = disc[v];
+            }
+        } else {
+            stack.pop();
+            if (stack.length === 0) break;
+            const p = stack[stack.length - 1];
+            if (low[u] < low[p]) low[p] = low[u];
+            size[p] += size[u];
+            if (low[u] > disc[p]) {
+                bridges.push(parentLine[u]);
+                below.push(u);
             }
         }
     }
 
-    // Start from first node
-    const firstNode = adj.keys().next().value;
-    if (firstNode !== undefined) {
-        dfs(firstNode, -1);
+    return { bridges, below, disc, order, size, reached: timer };
+}
+
+// Lowlink results depend only on topology and source, not on which lines
+// are in service, so compute them once per CSR graph and start bus; bridge
+// searches and single-line faults are then answered from them
+const lowlinkCache = new WeakMap();
+
+function getLowlink(csr, start) {
+    let byStart = lowlinkCache.get(csr);
+    if (!byStart) {
+        byStart = new Map();
+        lowlinkCache.set(csr, byStart);
     }
+    let entry = byStart.get(start);
+    if (!entry) {
+        entry = lowlinkDfs(csr, start);
+        entry.bridgeBelow = new Map(entry.bridges.map((line, i) => [line, entry.below[i]]));
+        entry.healthy = null;
+        byStart.set(start, entry);
+    }
+    return entry;
+}
 
-    return bridges;
+/**
+ * Find bridge edges (line indices) in the component of source, or of the
+ * first bus when source is omitted.
+ */
+export function findBridges(csr, source) {
+    if (csr.ids.length === 0) return [];
+    const start = source === undefined ? 0 : csr.index.get(source);
+    if (start === undefined) return [];
+    return getLowlink(csr, start).bridges.slice();
 }
 
 /**
  * Find a good bridge fault — one that disconnects ~5-15% of buses.
+ *
+ * A single lowlink DFS from the source gives every bridge together with the
+ * size of the DFS subtree below it, which is exactly the number of buses
+ * the fault would cut off, so no per-bridge BFS is needed.
  */
-export function findGoodBridgeFault(adj, source, lines, allBuses) {
-    const rawBridges = findBridges(adj, lines);
-    if (rawBridges.length === 0) return null;
+export function findGoodBridgeFault(csr, source, allBuses) {
+    const start = csr.index.get(source);
+    if (start === undefined) return null;
+    const { bridges, below, size, reached } = getLowlink(csr, start);
+    if (bridges.length === 0) return null;
 
-    // Filter out bridges that don't actually disconnect (double check)
-    // or that only disconnect the leaf itself (if we want bigger impact)
     const totalBuses = allBuses.length;
     const targetDisconnect = Math.floor(totalBuses * 0.10); // Aim for 10%
+    const alreadyDead = totalBuses - reached;
 
     let bestLine = null;
     let bestDiff = Infinity;
-    let foundAny = false;
-
-    // Prioritize bridges with significant impact
-    // Random sample to keep it fast
-    const sample = rawBridges.length > 50
-        ? rawBridges.sort(() => Math.random() - 0.5).slice(0, 50)
-        : rawBridges;
-
-    for (const lineIdx of sample) {
-        const disabled = new Set([lineIdx]);
-        const reachable = bfsFromSource(adj, source, disabled);
-        const disconnected = totalBuses - reachable.size;
-
-        // Must disconnect at least 1 node
-        if (disconnected > 0) {
-            foundAny = true;
-            const diff = Math.abs(disconnected - targetDisconnect);
-            if (diff < bestDiff) {
-                bestDiff = diff;
-                bestLine = lineIdx;
-            }
+    for (let i = 0; i < bridges.length; i++) {
+        const disconnected = alreadyDead + size[below[i]];
+        const diff = Math.abs(disconnected - targetDisconnect);
+        if (diff < bestDiff) {
+            bestDiff = diff;
+            bestLine = bridges[i];
         }
     }
+    return bestLine;
+}
 
-    // If we found a bridge with impact, return it.
-    // Otherwise fallback to first raw bridge (maybe it disconnects just 1 node)
-    return bestLine !== null ? bestLine : (foundAny ? rawBridges[0] : null);
+/**
+ * Energized status with at most one line out of service.
+ *
+ * This is the simulation's one reachability query. It is answered from the
+ * cached lowlink DFS instead of a traversal per fault: a line that is not a
+ * bridge on the source's side leaves the healthy status unchanged, and a
+ * bridge de-energizes exactly its DFS subtree. The returned array may be
+ * shared between calls; treat it as read-only.
+ * @param {Object} csr - CSR graph from buildCSR
+ * @param {number|null} faultLine - faulted line index, or null for none
+ * @returns {Uint8Array} status[busId] = 1 (live) or 0 (dead)
+ */
+export function getStatusWithFault(csr, source, faultLine, allBuses) {
+    const start = csr.index.get(source);
+    if (start === undefined) {
+        return makeStatus(allBuses, busId => busId === source);
+    }
+
+    const ll = getLowlink(csr, start);
+    if (!ll.healthy) {
+        const reached = new Set();
+        for (let t = 0; t < ll.reached; t++) reached.add(csr.ids[ll.order[t]]);
+        ll.healthy = makeStatus(allBuses, busId => reached.has(busId));
+    }
+
+    const below = faultLine === null ? undefined : ll.bridgeBelow.get(faultLine);
+    if (below === undefined) return ll.healthy;
+
+    // Buses outside allBuses are already 0, and writes past the end of a
+    // typed array are dropped, so the subtree can be cleared unconditionally
+    const status = ll.healthy.slice();
+    const end = ll.disc[below] + ll.size[below];
+    for (let t = ll.disc[below]; t < end; t++) {
+        status[csr.ids[ll.order[t]]] = 0;
+    }
+    return status;
 }
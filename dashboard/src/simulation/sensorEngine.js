@@ -6,38 +6,71 @@
  */
 
 /**
- * DFS preorder traversal from source.
+ * DFS preorder traversal from source over a CSR graph (see buildCSR).
+ * @returns {number[]} bus IDs in preorder
  */
-function dfsPreorder(adj, source) {
-    const visited = new Set();
-    const order = [];
-    const stack = [source];
+function dfsPreorder(csr, source) {
+    const { ids, index, indptr, indices } = csr;
+    const start = index.get(source);
+    if (start === undefined) return [source];
 
-    while (stack.length > 0) {
-        const node = stack.pop();
-        if (visited.has(node)) continue;
-        visited.add(node);
-        order.push(node);
+    // Every CSR edge slot is pushed at most once, so the stack fits in a
+    // fixed typed array
+    const visited = new Uint8Array(ids.length);
+    const order = new Int32Array(ids.length);
+    const stack = new Int32Array(indices.length + 1);
+    let count = 0;
+    let top = 0;
+    stack[top++] = start;
+
+    while (top > 0) {
+        const node = stack[--top];
+        if (visited[node]) continue;
+        visited[node] = 1;
+        order[count++] = node;
 
-        const neighbors = (adj.get(node) || []).map(n => n.to);
         // Reverse so we process in consistent order
-        for (let i = neighbors.length - 1; i >= 0; i--) {
-            if (!visited.has(neighbors[i])) {
-                stack.push(neighbors[i]);
+        for (let k = indptr[node + 1] - 1; k >= indptr[node]; k--) {
+            if (!visited[indices[k]]) {
+                stack[top++] = indices[k];
             }
         }
     }
-    return order;
+
+    const busIds = new Array(count);
+    for (let i = 0; i < count; i++) busIds[i] = ids[order[i]];
+    return busIds;
+}
+
+// DFS orderings depend only on the topology, not on energization or fault
+// state, so compute them once per CSR graph (i.e. per grid load)
+const orderingCache = new WeakMap();
+
+/**
+ * DFS preorder from source, cached per CSR graph.
+ */
+function getDfsOrdering(csr, source) {
+    let bySource = orderingCache.get(csr);
+    if (!bySource) {
+        bySource = new Map();
+        orderingCache.set(csr, bySource);
+    }
+    let ordering = bySource.get(source);
+    if (!ordering) {
+        ordering = dfsPreorder(csr, source);
+        bySource.set(source, ordering);
+    }
+    return ordering;
 }
 
 /**
  * Place √n sensors using DFS ordering.
- * @param {Map} adj - adjacency list
+ * @param {Object} csr - CSR graph from buildCSR
  * @param {number} source - ext_grid bus
  * @returns {{ sensors: number[], blocks: number[][] }}
  */
-export function placeSensorsSqrtN(adj, source) {
-    const ordering = dfsPreorder(adj, source);
+export function placeSensorsSqrtN(csr, source) {
+    const ordering = getDfsOrdering(csr, source);
     const n = ordering.length;
     if (n === 0) return { sensors: [], blocks: [] };
 
@@ -47,19 +80,25 @@ export function placeSensorsSqrtN(adj, source) {
         blocks.push(ordering.slice(i, i + k));
     }
 
-    const sensors = blocks.map(block => block[block.length - 1]);
+    // A sensor closes every block: positions k-1, 2k-1, ... plus the
+    // tail, which ends a short last block when k doesn't divide n
+    const sensors = [];
+    for (let i = k - 1; i < n; i += k) {
+        sensors.push(ordering[i]);
+    }
+    if (n % k !== 0) sensors.push(ordering[n - 1]);
 
     return { sensors, blocks };
 }
 
 /**
- * Read sensor status from energized map.
- * @returns {Map<number, number>} sensorBus -> 0|1
+ * Read sensor status from an energized status array (see getStatusWithFault).
+ * @returns {Uint8Array} readings[i] = 0|1 for sensors[i]
  */
 export function readSensors(sensors, energizedStatus) {
-    const readings = new Map();
-    for (const s of sensors) {
-        readings.set(s, energizedStatus.get(s) || 0);
+    const readings = new Uint8Array(sensors.length);
+    for (let i = 0; i < sensors.length; i++) {
+        readings[i] = energizedStatus[sensors[i]] || 0;
     }
     return readings;
 }
@@ -69,10 +108,5 @@ export function readSensors(sensors, energizedStatus) {
  * @returns {number} block index or -1
  */
 export function identifyFaultyBlock(sensors, sensorReadings) {
-    for (let i = 0; i < sensors.length; i++) {
-        if ((sensorReadings.get(sensors[i]) || 0) === 0) {
-            return i;
-        }
-    }
-    return -1;
+    return sensorReadings.indexOf(0);
 }
@@ -12,14 +12,23 @@ Usage:
 
 import os
 import sys
+import gzip
 import json
 import time
+from itertools import compress
+
+import numpy as np
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-from core.geojson_loader import load_overpass_geojson
+from core.geojson_loader import load_overpass_geojson, points_in_bbox
 from core.grid_builder import build_grid_from_geojson
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
 GEOJSON_FILE = os.path.join(os.path.dirname(__file__), "IndiaTransmission - Copy.geojson")
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "dashboard", "public", "grid_data.json")
 
@@ -31,12 +40,49 @@ BBOX = {
     "min_lat": 27.5,
     "max_lat": 29.0,
 }
+# The same box in core.geojson_loader's (lat_min, lon_min, lat_max, lon_max) order
+REGION_BBOX = (BBOX["min_lat"], BBOX["min_lon"], BBOX["max_lat"], BBOX["max_lon"])
+
+
+# Coordinates are exported as integers in units of 1e-5 degrees (~1 m):
+# shorter than the equivalent 5-decimal floats and faster to parse.
+# The dashboard divides them back by "coord_scale".
+COORD_SCALE = 100000
+
+
+def scale_coords(xy):
+    """(N, 2) lon/lat array -> nested [[lon, lat], ...] lists of scaled ints."""
+    return np.rint(np.asarray(xy, dtype=np.float64) * COORD_SCALE).astype(np.int64).tolist()
 
 
-def in_bbox(lon, lat, bbox=BBOX):
-    """Check if a point falls within the bounding box."""
-    return (bbox["min_lon"] <= lon <= bbox["max_lon"] and
-            bbox["min_lat"] <= lat <= bbox["max_lat"])
+# Towers and poles are thinned to the first point per 1e-4° grid cell
+# (~11 m); points sharing a cell draw as the same dot at dashboard zooms
+POINT_CELL_DEG = 1e-4
+
+
+def first_point_per_cell(pts, cell_deg=POINT_CELL_DEG):
+    """Rows of an (N, 2) lon/lat array, keeping the first point in each grid cell."""
+    cells = np.rint(pts / cell_deg).astype(np.int64)
+    _, first = np.unique(cells, axis=0, return_index=True)
+    return pts[np.sort(first)]
+
+
+def export_point_coords(features, bbox=REGION_BBOX):
+    """
+    [lon, lat] (scaled ints) of the Point features within the bounding box,
+    thinned by first_point_per_cell.
+    """
+    coords = []
+    for feat in features:
+        geom = feat.get('geometry', {})
+        if geom.get('type') == 'Point':
+            c = geom.get('coordinates', [])
+            if len(c) >= 2:
+                coords.append((c[0], c[1]))
+    
+    pts = np.array(coords, dtype=np.float64).reshape(-1, 2)
+    pts = pts[points_in_bbox(pts[:, 0], pts[:, 1], bbox)]
+    return scale_coords(first_point_per_cell(pts))
 
 
 def main():
@@ -52,56 +98,43 @@ def main():
     print(f"Full grid: {grid.num_buses} buses, {grid.num_lines} edges")
     
     # ── Filter buses to Delhi NCR bounding box ──
-    region_bus_ids = set()
-    for bus_id in grid.G.nodes():
-        geo = grid.bus_geo.get(bus_id, (0, 0))
-        lon, lat = geo[0], geo[1]
-        if in_bbox(lon, lat):
-            region_bus_ids.add(bus_id)
+    bus_xy = grid.bus_xy[grid.node_ids]
+    in_region = points_in_bbox(bus_xy[:, 0], bus_xy[:, 1], REGION_BBOX)
+    region_ids = grid.node_ids[in_region].tolist()
+    region_bus_ids = set(region_ids)
     
     print(f"Buses in Delhi NCR: {len(region_bus_ids)} / {grid.num_buses}")
     
     # ── Export buses: [id, lon, lat, voltage_kv] ──
     buses = []
-    for bus_id in region_bus_ids:
-        geo = grid.bus_geo.get(bus_id, (0, 0))
+    for bus_id, (lon, lat) in zip(region_ids, scale_coords(bus_xy[in_region])):
         voltage = grid.bus_voltage.get(bus_id, 11.0)
-        buses.append([bus_id, round(geo[0], 5), round(geo[1], 5), voltage])
+        buses.append([bus_id, lon, lat, voltage])
     
     # ── Export lines: only those connecting two buses within the region ──
-    lines = []
-    new_idx = 0
-    for line in grid.line_list:
-        if line['from_bus'] in region_bus_ids and line['to_bus'] in region_bus_ids:
-            lines.append([
-                new_idx,
-                line['from_bus'],
-                line['to_bus'],
-                line['voltage_kv'],
-                line['name']
-            ])
-            new_idx += 1
+    # Bus IDs index rows of bus_xy, so region membership is one lookup array
+    bus_in_region = np.zeros(len(grid.bus_xy), dtype=bool)
+    bus_in_region[grid.node_ids[in_region]] = True
+    keep_line = bus_in_region[grid.line_from] & bus_in_region[grid.line_to]
+    
+    lines = [
+        [new_idx, from_bus, to_bus, voltage_kv, name]
+        for new_idx, (from_bus, to_bus, voltage_kv, name) in enumerate(zip(
+            grid.line_from[keep_line].tolist(), grid.line_to[keep_line].tolist(),
+            grid.line_voltage[keep_line].tolist(), compress(grid.line_name, keep_line.tolist())))
+    ]
     
     # ── Export towers within bbox ──
-    towers = []
-    for feat in classified.get('towers', []):
-        geom = feat.get('geometry', {})
-        if geom.get('type') == 'Point':
-            coords = geom.get('coordinates', [])
-            if len(coords) >= 2 and in_bbox(coords[0], coords[1]):
-                towers.append([round(coords[0], 5), round(coords[1], 5)])
+    towers = export_point_coords(classified.get('towers', []))
     
     # ── Export poles within bbox ──
-    poles = []
-    for feat in classified.get('poles', []):
-        geom = feat.get('geometry', {})
-        if geom.get('type') == 'Point':
-            coords = geom.get('coordinates', [])
-            if len(coords) >= 2 and in_bbox(coords[0], coords[1]):
-                poles.append([round(coords[0], 5), round(coords[1], 5)])
+    poles = export_point_coords(classified.get('poles', []))
     
     # ── Export substations within bbox ──
-    substations = []
+    # Gather each substation's position (the point, or the ring centroid)
+    # first, then test them all against the bbox at once
+    sub_rows = []
+    sub_coords = []
     for feat in classified.get('substations', []):
         props = feat.get('properties', {})
         geom = feat.get('geometry', {})
@@ -112,20 +145,25 @@ def main():
         
         if geom_type == 'Point':
             coords = geom.get('coordinates', [])
-            if len(coords) >= 2 and in_bbox(coords[0], coords[1]):
-                substations.append([round(coords[0], 5), round(coords[1], 5), voltage_str, name])
+            if len(coords) >= 2:
+                sub_coords.append((coords[0], coords[1]))
+                sub_rows.append((voltage_str, name))
         elif geom_type == 'Polygon':
             ring = geom.get('coordinates', [[]])[0]
             if ring:
                 lons = [c[0] for c in ring]
                 lats = [c[1] for c in ring]
-                cx = sum(lons) / len(lons)
-                cy = sum(lats) / len(lats)
-                if in_bbox(cx, cy):
-                    substations.append([
-                        round(cx, 5), round(cy, 5),
-                        voltage_str, name
-                    ])
+                sub_coords.append((sum(lons) / len(lons), sum(lats) / len(lats)))
+                sub_rows.append((voltage_str, name))
+    
+    sub_xy = np.array(sub_coords, dtype=np.float64).reshape(-1, 2)
+    substations = [
+        [lon, lat, voltage_str, name]
+        for keep, (lon, lat), (voltage_str, name)
+        in zip(points_in_bbox(sub_xy[:, 0], sub_xy[:, 1], REGION_BBOX).tolist(),
+               scale_coords(sub_xy), sub_rows)
+        if keep
+    ]
     
     # ── Pick a power source bus within the region ──
     ext_grid_bus = grid.ext_grid_bus
@@ -149,6 +187,7 @@ def main():
         "poles": poles,
         "substations": substations,
         "ext_grid_bus": ext_grid_bus,
+        "coord_scale": COORD_SCALE,
         "stats": {
             "total_buses": len(buses),
             "total_lines": len(lines),
@@ -161,14 +200,27 @@ def main():
     # Ensure output dir exists
     os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
     
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(data, f, separators=(',', ':'))
+    # orjson serializes straight to compact UTF-8 bytes, several times
+    # faster than json.dump's incremental writes
+    if orjson is not None:
+        payload = orjson.dumps(data)
+    else:
+        payload = json.dumps(data, separators=(',', ':')).encode()
+    
+    with open(OUTPUT_FILE, 'wb') as f:
+        f.write(payload)
+    
+    # Precompressed copy for static servers that serve .gz siblings as-is
+    # (nginx gzip_static, most CDNs); mtime=0 keeps it reproducible
+    with open(OUTPUT_FILE + '.gz', 'wb') as f:
+        f.write(gzip.compress(payload, compresslevel=6, mtime=0))
     
-    file_mb = os.path.getsize(OUTPUT_FILE) / (1024 * 1024)
+    file_mb = len(payload) / (1024 * 1024)
+    gz_mb = os.path.getsize(OUTPUT_FILE + '.gz') / (1024 * 1024)
     
     print(f"\n✅ Exported to {OUTPUT_FILE}")
     print(f"   Region: Delhi NCR ({BBOX})")
-    print(f"   Size: {file_mb:.1f} MB")
+    print(f"   Size: {file_mb:.1f} MB ({gz_mb:.1f} MB gzipped)")
     print(f"   Buses: {len(buses)}")
     print(f"   Lines: {len(lines)}")
     print(f"   Towers: {len(towers)}")